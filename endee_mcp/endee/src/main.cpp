@@ -1,6 +1,7 @@
 // System includes
 #include <iostream>
 #include <filesystem>
+#include <cstring>
 
 // ASIO/Crow related
 #include "crow/query_string.h"
@@ -82,6 +83,43 @@ struct AuthMiddleware : crow::ILocalMiddleware {
 
     void after_handle(crow::request&, crow::response&, context&) {}
 };
+
+// Body compression middleware (runs for every route)
+// Requests sent with "Content-Encoding: gzip" or "deflate" are inflated before
+// the handler sees them. Responses are gzip-compressed by Crow when the client
+// accepts it; small bodies and already-compressed archives are left as is.
+struct CompressionMiddleware {
+    struct context {};
+
+    void before_handle(crow::request& req, crow::response& res, context&) {
+        std::string encoding = req.get_header_value("Content-Encoding");
+        if(encoding.empty() || encoding == "identity") {
+            return;
+        }
+        if(encoding != "gzip" && encoding != "deflate") {
+            res.code = 415;
+            res.write("Unsupported Content-Encoding: " + encoding);
+            res.end();
+            return;
+        }
+        std::string body = crow::compression::decompress_string(req.body);
+        if(body.empty() && !req.body.empty()) {
+            res.code = 400;
+            res.write("Failed to decompress request body");
+            res.end();
+            return;
+        }
+        req.body = std::move(body);
+    }
+
+    void after_handle(crow::request&, crow::response& res, context&) {
+        if(res.body.size() < settings::MIN_COMPRESSION_BYTES
+           || res.get_header_value("Content-Type") == "application/gzip") {
+            res.compressed = false;
+        }
+    }
+};
+
 // Helper function to send error messages in JSON format
 inline crow::response json_error(int code, const std::string& message) {
     crow::json::wvalue err_json({{"error", message}});
@@ -96,6 +134,98 @@ json_error_500(const std::string& username, const std::string& path, const std::
     return crow::response(500, err_json.dump());
 }
 
+// Decode a compact vector batch sent as a msgpack map. Two layouts exist:
+//   int8:    {"ids": [str], "dim": int, "q": bin(N * dim int8), "scales": [float], ...}
+//   float32: {"ids": [str], "dim": int, "v": bin(N * dim little-endian float32), ...}
+// Both accept optional "norms": [float], "meta": [bin] and "filter": [str].
+// int8 rows are dequantized back to float (q * scale) and float32 rows are
+// copied as-is, so either goes through the regular insertion path.
+inline std::vector<ndd::VectorObject> decode_packed_batch(const msgpack::object& obj) {
+    auto fields = obj.as<std::map<std::string, msgpack::object>>();
+    auto field = [&fields](const std::string& name) -> const msgpack::object& {
+        auto it = fields.find(name);
+        if(it == fields.end()) {
+            throw std::runtime_error("Missing field in packed batch: " + name);
+        }
+        return it->second;
+    };
+
+    auto ids = field("ids").as<std::vector<std::string>>();
+    size_t dim = field("dim").as<size_t>();
+    bool is_float32 = fields.count("v") > 0;
+    const msgpack::object& data_field = field(is_float32 ? "v" : "q");
+    if(data_field.type != msgpack::type::BIN) {
+        throw std::runtime_error(is_float32 ? "Field 'v' must be binary float32 data"
+                                            : "Field 'q' must be binary int8 data");
+    }
+    size_t elem_size = is_float32 ? sizeof(float) : sizeof(int8_t);
+    if(data_field.via.bin.size != ids.size() * dim * elem_size) {
+        throw std::runtime_error("Packed batch size mismatch between ids and vector data");
+    }
+    std::vector<float> scales;
+    if(!is_float32) {
+        scales = field("scales").as<std::vector<float>>();
+        if(scales.size() != ids.size()) {
+            throw std::runtime_error("Int8 batch size mismatch between ids and scales");
+        }
+    }
+
+    std::vector<float> norms(ids.size(), 1.0f);
+    std::vector<std::vector<uint8_t>> metas;
+    std::vector<std::string> filters;
+    if(fields.count("norms")) {
+        norms = fields["norms"].as<std::vector<float>>();
+    }
+    if(fields.count("meta")) {
+        metas = fields["meta"].as<std::vector<std::vector<uint8_t>>>();
+    }
+    if(fields.count("filter")) {
+        filters = fields["filter"].as<std::vector<std::string>>();
+    }
+    if(norms.size() != ids.size() || (!metas.empty() && metas.size() != ids.size())
+       || (!filters.empty() && filters.size() != ids.size())) {
+        throw std::runtime_error("Packed batch size mismatch between ids and per-vector fields");
+    }
+
+    std::vector<ndd::VectorObject> vectors(ids.size());
+    for(size_t i = 0; i < ids.size(); ++i) {
+        auto& vec = vectors[i];
+        vec.id = std::move(ids[i]);
+        vec.norm = norms[i];
+        if(!metas.empty()) {
+            vec.meta = std::move(metas[i]);
+        }
+        if(!filters.empty()) {
+            vec.filter = std::move(filters[i]);
+        }
+        vec.vector.resize(dim);
+        if(is_float32) {
+            // bin data has no alignment guarantee, so copy rather than cast
+            std::memcpy(vec.vector.data(), data_field.via.bin.ptr + i * dim * sizeof(float),
+                        dim * sizeof(float));
+        } else {
+            const int8_t* row = reinterpret_cast<const int8_t*>(data_field.via.bin.ptr) + i * dim;
+            for(size_t j = 0; j < dim; ++j) {
+                vec.vector[j] = static_cast<float>(row[j]) * scales[i];
+            }
+        }
+    }
+    return vectors;
+}
+
+// Decode a dense query vector sent as "vector_b64": base64 of little-endian
+// float32 bytes. Smaller than a JSON number array and copied without parsing
+// each element.
+inline std::vector<float> decode_vector_b64(const std::string& encoded) {
+    std::string raw = crow::utility::base64decode(encoded);
+    if(raw.size() % sizeof(float) != 0) {
+        throw std::runtime_error("vector_b64 must hold float32 data");
+    }
+    std::vector<float> vector(raw.size() / sizeof(float));
+    std::memcpy(vector.data(), raw.data(), raw.size());
+    return vector;
+}
+
 /**
  * Checks if the CPU is compatible with all
  * the instruction sets being used for x86, ARM and MAC Mxx
@@ -227,7 +357,9 @@ int main(int argc, char** argv) {
     LOG_INFO("Created index manager");
 
     // Initialize the app
-    crow::App<AuthMiddleware> app{AuthMiddleware(auth_manager)};
+    crow::App<CompressionMiddleware, AuthMiddleware> app{CompressionMiddleware(),
+                                                         AuthMiddleware(auth_manager)};
+    app.use_compression(crow::compression::algorithm::GZIP);
 
     // ========== GENERAL ==========
     // Health check endpoint (no auth required)
@@ -651,12 +783,18 @@ int main(int argc, char** argv) {
                     return json_error(400, "Missing required parameters: k");
                 }
 
-                if(!body.has("vector") && !body.has("sparse_indices")) {
+                if(!body.has("vector") && !body.has("vector_b64") && !body.has("sparse_indices")) {
                     return json_error(400, "Missing query vector (dense or sparse)");
                 }
 
                 std::vector<float> query;
-                if(body.has("vector")) {
+                if(body.has("vector_b64")) {
+                    try {
+                        query = decode_vector_b64(std::string(body["vector_b64"].s()));
+                    } catch(const std::exception& e) {
+                        return json_error(400, e.what());
+                    }
+                } else if(body.has("vector")) {
                     for(const auto& elem : body["vector"]) {
                         query.push_back((float)elem.d());
                     }
@@ -696,7 +834,12 @@ int main(int argc, char** argv) {
 
                 if(body.has("filter")) {
                     try {
-                        auto raw_filter = nlohmann::json::parse(body["filter"].s());
+                        // Filter may be sent either as a JSON string or as a native array
+                        nlohmann::json raw_filter =
+                                body["filter"].t() == crow::json::type::String
+                                        ? nlohmann::json::parse(std::string(body["filter"].s()))
+                                        : nlohmann::json::parse(
+                                                crow::json::wvalue(body["filter"]).dump());
                         // Expect new array-based filter format
                         if(!raw_filter.is_array()) {
                             return json_error(400,
@@ -737,6 +880,118 @@ int main(int argc, char** argv) {
                 }
             });
 
+    // Batch search: run several queries against the same index in one request
+    CROW_ROUTE(app, "/api/v1/index/<string>/search/batch")
+            .CROW_MIDDLEWARES(app, AuthMiddleware)
+            .methods("POST"_method)([&index_manager, &app](const crow::request& req,
+                                                           std::string index_name) {
+                auto& ctx = app.get_context<AuthMiddleware>(req);
+                // Format full index_id
+                std::string index_id = ctx.username + "/" + index_name;
+
+                nlohmann::json body;
+                try {
+                    body = nlohmann::json::parse(req.body);
+                } catch(const std::exception& e) {
+                    return json_error(400, "Invalid JSON body");
+                }
+
+                if(!body.contains("queries") || !body["queries"].is_array()) {
+                    return json_error(400,
+                                      "Missing or invalid 'queries' field. Must be a list of "
+                                      "query objects.");
+                }
+                const auto& queries = body["queries"];
+                if(queries.size() > settings::MAX_BATCH_QUERIES) {
+                    return json_error(400,
+                                      "At most " + std::to_string(settings::MAX_BATCH_QUERIES)
+                                              + " queries allowed per batch");
+                }
+
+                size_t ef = body.value("ef", (size_t)0);
+                bool include_vectors = body.value("include_vectors", false);
+
+                std::vector<std::vector<ndd::VectorResult>> batch_results;
+                batch_results.reserve(queries.size());
+
+                try {
+                    for(const auto& q : queries) {
+                        if(!q.contains("k")) {
+                            return json_error(400, "Missing required parameters: k");
+                        }
+                        if(!q.contains("vector") && !q.contains("vector_b64")
+                           && !q.contains("sparse_indices")) {
+                            return json_error(400, "Missing query vector (dense or sparse)");
+                        }
+
+                        std::vector<float> query =
+                                q.contains("vector_b64")
+                                        ? decode_vector_b64(q["vector_b64"].get<std::string>())
+                                        : q.value("vector", std::vector<float>{});
+                        std::vector<uint32_t> sparse_indices =
+                                q.value("sparse_indices", std::vector<uint32_t>{});
+                        std::vector<float> sparse_values =
+                                q.value("sparse_values", std::vector<float>{});
+
+                        if(sparse_indices.size() != sparse_values.size()) {
+                            return json_error(
+                                    400, "Mismatch between sparse_indices and sparse_values size");
+                        }
+
+                        size_t k = q["k"].get<size_t>();
+                        if(k < settings::MIN_K || k > settings::MAX_K) {
+                            LOG_ERROR("Invalid k: " << k);
+                            return json_error(400,
+                                              "k must be between " + std::to_string(settings::MIN_K)
+                                                      + " and " + std::to_string(settings::MAX_K));
+                        }
+
+                        // Filter may be sent either as a JSON string or as a native array
+                        nlohmann::json filter_array = nlohmann::json::array();
+                        if(q.contains("filter")) {
+                            nlohmann::json raw_filter = q["filter"];
+                            if(raw_filter.is_string()) {
+                                raw_filter = nlohmann::json::parse(raw_filter.get<std::string>());
+                            }
+                            if(!raw_filter.is_array()) {
+                                return json_error(400,
+                                                  "Filter must be an array. Please use format: "
+                                                  "[{\"field\":{\"$op\":value}}]");
+                            }
+                            filter_array = std::move(raw_filter);
+                        }
+
+                        auto search_response = index_manager.searchKNN(index_id,
+                                                                       query,
+                                                                       sparse_indices,
+                                                                       sparse_values,
+                                                                       k,
+                                                                       filter_array,
+                                                                       include_vectors,
+                                                                       ef);
+                        if(!search_response) {
+                            return json_error(404, "Index not found or search failed");
+                        }
+                        batch_results.push_back(std::move(search_response.value()));
+                    }
+
+                    // One ResultSet per query, in request order
+                    msgpack::sbuffer sbuf;
+                    msgpack::pack(sbuf, batch_results);
+                    crow::response resp(200, std::string(sbuf.data(), sbuf.size()));
+                    resp.add_header("Content-Type", "application/msgpack");
+                    return resp;
+                } catch(const nlohmann::json::exception& e) {
+                    return json_error(400, std::string("Invalid query: ") + e.what());
+                } catch(const std::runtime_error& e) {
+                    return json_error(400, e.what());
+                } catch(const std::exception& e) {
+                    LOG_DEBUG("Batch search failed: " << e.what());
+                    return json_error_500(
+                            ctx.username, req.url, std::string("Batch search failed: ") + e.what());
+                }
+            });
+
     //  Insert a list of vectors
     CROW_ROUTE(app, "/api/v1/index/<string>/vector/insert")
             .CROW_MIDDLEWARES(app, AuthMiddleware)
@@ -809,6 +1064,14 @@ int main(int argc, char** argv) {
                         auto oh = msgpack::unpack(req.body.data(), req.body.size());
                         auto obj = oh.get();
 
+                        if(obj.type == msgpack::type::MAP) {
+                            // Compact int8 or float32 batch
+                            auto vectors = decode_packed_batch(obj);
+                            LOG_DEBUG("Batch size (Packed): " << vectors.size());
+                            bool success = index_manager.addVectors(index_id, vectors);
+                            return crow::response(success ? 200 : 400);
+                        }
+
                         try {
                             // Try HybridVectorObject first
                             auto vectors = obj.as<std::vector<ndd::HybridVectorObject>>();
@@ -32,6 +32,10 @@ namespace settings {
     constexpr size_t DEFAULT_EF_SEARCH = 128;
     constexpr size_t MIN_K = 1;
     constexpr size_t MAX_K = 4096;
+    // Maximum number of queries accepted by a single batch search request
+    constexpr size_t MAX_BATCH_QUERIES = 256;
+    // Responses smaller than this are sent uncompressed even if the client accepts gzip
+    constexpr size_t MIN_COMPRESSION_BYTES = 4 * KB;
     constexpr size_t RANDOM_SEED = 100;
     constexpr size_t SAVE_EVERY_N_UPDATES = 10'000;
     constexpr size_t RECOVERY_BATCH_SIZE = 20'000;
@@ -18,6 +18,9 @@ import asyncio
 import os
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 # Add mcp/src to path for examples
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "mcp" / "src"))
@@ -40,12 +43,21 @@ ENDEE_AUTH_TOKEN = os.getenv("ENDEE_AUTH_TOKEN", "")
 # Helper Functions
 # ============================================================================
 
+_shared_client: EndeeClient | None = None
+
+
 def get_client():
-    """Create an Endee client."""
-    return EndeeClient(
-        base_url=ENDEE_URL,
-        auth_token=ENDEE_AUTH_TOKEN if ENDEE_AUTH_TOKEN else None
-    )
+    """Return the Endee client shared by all examples.
+    
+    Reusing one client keeps its connections alive between examples.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = EndeeClient(
+            base_url=ENDEE_URL,
+            auth_token=ENDEE_AUTH_TOKEN if ENDEE_AUTH_TOKEN else None
+        )
+    return _shared_client
 
 
 def get_embedding_manager():
@@ -56,9 +68,62 @@ def get_embedding_manager():
         openai_api_key=config.openai_api_key if config.openai_api_key else None,
         openai_model=config.openai_embedding_model,
         local_model=config.local_embedding_model,
+        query_cache_size=config.query_cache_size,
+        embed_cache_size=config.embed_cache_size,
     )
 
 
+async def import_jsonl(client, provider, index_name, path, batch_size=64, concurrency=8):
+    """Stream a JSONL file into an index with batched, concurrent embedding.
+    
+    A reader feeds parsed records into a bounded queue; ``concurrency``
+    workers each collect ``batch_size`` records (fewer only at the end of
+    the file), embed them in one call and upsert them in one request.
+    Records are never embedded one at a time.
+    
+    Returns:
+        Number of records imported
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 4)
+    imported = 0
+    
+    async def produce():
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    await queue.put(orjson.loads(line))
+        for _ in range(concurrency):
+            await queue.put(None)
+    
+    async def consume():
+        nonlocal imported
+        done = False
+        while not done:
+            batch = []
+            while len(batch) < batch_size:
+                item = await queue.get()
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            if not batch:
+                continue
+            embeddings = await provider.embed_texts([d["description"] for d in batch])
+            await client.upsert_vectors(index_name, [
+                {
+                    "id": d["id"],
+                    "vector": embedding,
+                    "meta": {"name": d["name"], "price": d["price"]},
+                    "filter": {"category": d["category"]}
+                }
+                for d, embedding in zip(batch, embeddings)
+            ])
+            imported += len(batch)
+    
+    await asyncio.gather(produce(), *(consume() for _ in range(concurrency)))
+    return imported
+
+
 # ============================================================================
 # Example 1: Health Check
 # ============================================================================
@@ -78,8 +143,6 @@ async def example_health_check():
         print(f"   Timestamp: {health.get('timestamp')}")
     except Exception as e:
         print(f"❌ Health check failed: {e}")
-    finally:
-        await client.close()
 
 
 # ============================================================================
@@ -140,8 +203,6 @@ async def example_index_management():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-    finally:
-        await client.close()
 
 
 # ============================================================================
@@ -165,11 +226,8 @@ async def example_vector_operations():
             space_type="cosine",
             precision="int8d"
         )
-        try:
-            await client.create_index(config)
-            print(f"✅ Created index '{index_name}'")
-        except:
-            print(f"ℹ️  Using existing index '{index_name}'")
+        # Create the index in the background while the payload is built
+        create_task = asyncio.create_task(client.create_index(config))
         
         # 1. Insert vectors
         print("\n1. Inserting vectors...")
@@ -194,6 +252,12 @@ async def example_vector_operations():
             }
         ]
         
+        try:
+            await create_task
+            print(f"✅ Created index '{index_name}'")
+        except Exception:
+            print(f"ℹ️  Using existing index '{index_name}'")
+        
         result = await client.upsert_vectors(index_name, vectors)
         print(f"   ✅ Inserted vectors: {result}")
         
@@ -235,8 +299,6 @@ async def example_vector_operations():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-    finally:
-        await client.close()
 
 
 # ============================================================================
@@ -266,11 +328,8 @@ async def example_text_search():
             space_type="cosine",
             precision="int8d"
         )
-        try:
-            await client.create_index(config)
-            print(f"✅ Created index '{index_name}'")
-        except:
-            print(f"ℹ️  Using existing index '{index_name}'")
+        # Create the index while the documents are embedded
+        create_task = asyncio.create_task(client.create_index(config))
         
         # Insert documents with embeddings
         print("\n1. Inserting documents with automatic embeddings...")
@@ -299,50 +358,73 @@ async def example_text_search():
         texts = [doc["text"] for doc in documents]
         embeddings = await provider.embed_texts(texts)
         
-        # Create vectors
-        vectors = []
-        for doc, embedding in zip(documents, embeddings):
-            vectors.append({
-                "id": doc["id"],
-                "vector": embedding,
-                "meta": doc["meta"],
-                "filter": doc["filter"]
-            })
-        
-        await client.upsert_vectors(index_name, vectors)
-        print(f"   ✅ Inserted {len(vectors)} documents")
-        
-        # Search with text query
-        print("\n2. Searching for 'Italian dinner ideas'...")
-        query_embedding = await provider.embed_query("Italian dinner ideas")
-        results = await client.search(
-            index_name=index_name,
-            vector=query_embedding,
-            top_k=2
-        )
-        print(f"   Found {len(results)} results:")
-        for r in results:
-            meta = r.meta or {}
-            print(f"   - {r.id}: {meta.get('type', 'unknown')} ({r.similarity:.4f})")
+        try:
+            await create_task
+            print(f"✅ Created index '{index_name}'")
+        except Exception:
+            print(f"ℹ️  Using existing index '{index_name}'")
         
-        # Search with filter
-        print("\n3. Searching for easy recipes only...")
-        results = await client.search(
+        # Check the index itself, which may predate this config; the client
+        # normalizes only if its space type is cosine
+        info = await client.get_index_info(index_name)
+        if info.get("precision") == "int8d":
+            # Quantize on the client: one byte per element on the wire
+            await client.upsert_vectors_int8(
+                index_name,
+                ids=[doc["id"] for doc in documents],
+                vectors=np.asarray(embeddings, dtype=np.float32),
+                meta=[doc["meta"] for doc in documents],
+                filters=[doc["filter"] for doc in documents]
+            )
+        else:
+            vectors = []
+            for doc, embedding in zip(documents, embeddings):
+                vectors.append({
+                    "id": doc["id"],
+                    "vector": embedding,
+                    "meta": doc["meta"],
+                    "filter": doc["filter"]
+                })
+            await client.upsert_vectors(index_name, vectors)
+        print(f"   ✅ Inserted {len(documents)} documents")
+        
+        queries = ["Italian dinner ideas", "Warm soup for a cold day", "Fast noodle lunch"]
+        query_embeddings = await provider.embed_texts(queries)
+        # Repeated query texts are served from the embedding cache
+        query_embedding = await embedding_manager.embed_query_cached("Italian dinner ideas")
+        
+        # Start the batch search, then stream the filtered searches while it runs
+        batch_task = asyncio.create_task(client.batch_search(
             index_name=index_name,
-            vector=query_embedding,
-            top_k=10,
-            filter_conditions=[{"difficulty": {"$eq": "easy"}}]
-        )
-        print(f"   Found {len(results)} easy recipes:")
-        for r in results:
-            print(f"   - {r.id}: {r.similarity:.4f}")
+            queries=[{"vector": emb, "k": 2} for emb in query_embeddings]
+        ))
+        
+        print("\n2. Recipes by difficulty (printed as each search finishes)...")
+        difficulties = ["easy", "medium"]
+        filtered_queries = [
+            {"vector": query_embedding, "k": 10, "filter": [{"difficulty": {"$eq": d}}]}
+            for d in difficulties
+        ]
+        async for position, results in client.search_stream(index_name, filtered_queries):
+            print(f"   Found {len(results)} {difficulties[position]} recipes:")
+            for r in results:
+                print(f"   - {r.id}: {r.similarity:.4f}")
+        # Asking the same query again is answered from the query cache
+        await embedding_manager.embed_query_cached("Italian dinner ideas")
+        print(f"   Query cache hit rate after a repeat: {embedding_manager.query_cache.hit_rate:.0%}")
+        
+        batch_results = await batch_task
+        print(f"\n3. Batch searched {len(queries)} queries:")
+        for query, query_results in zip(queries, batch_results):
+            print(f"   '{query}': {len(query_results)} results")
+            for r in query_results:
+                meta = r.meta or {}
+                print(f"   - {r.id}: {meta.get('type', 'unknown')} ({r.similarity:.4f})")
         
         print("\n✅ Text search example completed!")
         
     except Exception as e:
         print(f"❌ Error: {e}")
-    finally:
-        await client.close()
 
 
 # ============================================================================
@@ -405,8 +487,6 @@ async def example_backup_operations():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-    finally:
-        await client.close()
 
 
 # ============================================================================
@@ -423,6 +503,7 @@ async def example_batch_import():
     import tempfile
     
     client = get_client()
+    embedding_manager = get_embedding_manager()
     index_name = "example-batch"
     
     try:
@@ -459,10 +540,11 @@ async def example_batch_import():
         
         print(f"   ✅ Created: {temp_path}")
         
-        # Create index
+        # Create index with the embedding dimension
+        provider = embedding_manager.get_provider()
         config = IndexConfig(
             name=index_name,
-            dimension=384,  # Assuming local embeddings
+            dimension=provider.dimension,
             space_type="cosine"
         )
         try:
@@ -471,26 +553,18 @@ async def example_batch_import():
         except:
             print(f"ℹ️  Using existing index '{index_name}'")
         
-        # Note: Full batch import would use embedding manager
-        # This is a simplified example
-        print("\n2. Reading and preparing data for import...")
-        
-        with open(temp_path, 'r') as f:
-            for line in f:
-                data = json.loads(line.strip())
-                print(f"   - {data['id']}: {data['name']}")
+        print("\n2. Streaming records through the embedding pipeline...")
+        imported = await import_jsonl(client, provider, index_name, temp_path)
+        print(f"   ✅ Imported {imported} records")
         
         # Cleanup
         os.unlink(temp_path)
         print(f"   ✅ Cleaned up temp file")
         
         print("\n✅ Batch import example completed!")
-        print("   (In production, use endee_import_json tool for full import with embeddings)")
         
     except Exception as e:
         print(f"❌ Error: {e}")
-    finally:
-        await client.close()
 
 
 # ============================================================================
@@ -499,23 +573,30 @@ async def example_batch_import():
 
 async def run_all_examples():
     """Run all examples."""
+    global _shared_client
+    
     print("\n" + "="*60)
     print("Endee MCP Examples")
     print("="*60)
     print(f"\nConnecting to: {ENDEE_URL}")
     print(f"Auth enabled: {bool(ENDEE_AUTH_TOKEN)}")
     
-    # Run examples
-    await example_health_check()
-    await example_index_management()
-    await example_vector_operations()
-    # Skip text search if no embedding provider available
+    # Run examples on one shared client
     try:
-        await example_text_search()
-    except Exception as e:
-        print(f"\n⚠️  Skipping text search example: {e}")
-    await example_backup_operations()
-    await example_batch_import()
+        await example_health_check()
+        await example_index_management()
+        await example_vector_operations()
+        # Skip text search if no embedding provider available
+        try:
+            await example_text_search()
+        except Exception as e:
+            print(f"\n⚠️  Skipping text search example: {e}")
+        await example_backup_operations()
+        await example_batch_import()
+    finally:
+        if _shared_client is not None:
+            await _shared_client.close()
+            _shared_client = None
     
     print("\n" + "="*60)
     print("All examples completed!")
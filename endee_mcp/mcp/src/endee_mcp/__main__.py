@@ -1,13 +1,6 @@
 """Endee MCP Framework - Entry point."""
 
-import asyncio
-
-from .server import main
-
-
-def run():
-    """Run the MCP server."""
-    asyncio.run(main())
+from .server import run
 
 
 if __name__ == "__main__":
@@ -1,11 +1,33 @@
 """Endee MCP Framework - Endee HTTP client."""
 
-import json
+import asyncio
+import base64
+import functools
+import time
+import zlib
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
+import msgpack
+import numpy as np
+import orjson
 
-from .types import IndexConfig, SearchResult
+try:
+    from ormsgpack import unpackb as _unpackb
+except ImportError:
+    def _unpackb(data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+from .quantize import normalize_rows, quantize_int8
+from .semantic_cache import SemanticQueryCache
+from .types import IndexConfig, IndexConfigListAdapter, SearchResult
+
+
+@functools.lru_cache(maxsize=64)
+def _search_skeleton(top_k: int, ef: int, include_vectors: bool) -> dict[str, Any]:
+    """Constant part of a search payload; callers must copy before mutating."""
+    return {"k": top_k, "ef": ef, "include_vectors": include_vectors}
 
 
 class EndeeError(Exception):
@@ -16,23 +38,102 @@ class EndeeError(Exception):
 class EndeeClient:
     """Async HTTP client for Endee Vector Database."""
     
-    def __init__(self, base_url: str, auth_token: str | None = None):
+    # Request bodies below this size are never compressed
+    COMPRESSION_MIN_BYTES = 4096
+    
+    def __init__(
+        self,
+        base_url: str,
+        auth_token: str | None = None,
+        semantic_cache: SemanticQueryCache | None = None,
+        cache_ttl: float = 5.0,
+        http2: bool = False,
+        compress_requests: bool = False,
+    ):
         """Initialize the client.
         
         Args:
             base_url: Endee server URL (e.g., http://localhost:8080)
             auth_token: Optional authentication token
+            semantic_cache: Optional cache that answers near-duplicate
+                unfiltered dense queries without a request
+            cache_ttl: Seconds to reuse index listings and index info
+                (0 disables)
+            http2: Negotiate HTTP/2 so concurrent requests share one
+                connection (requires the ``h2`` package)
+            compress_requests: Deflate large request bodies (the server must
+                support ``Content-Encoding``); responses are decompressed
+                automatically either way
         """
         self.base_url = base_url.rstrip("/")
         self.auth_token = auth_token
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Built once; every request reuses these dicts
+        self._headers = {"Content-Type": "application/json"}
+        if auth_token:
+            self._headers["Authorization"] = auth_token
+        self._msgpack_headers = {**self._headers, "Content-Type": "application/msgpack"}
+        self.compress_requests = compress_requests
+        self.semantic_cache = semantic_cache
+        self.cache_ttl = cache_ttl
+        self._list_cache: tuple[float, list[IndexConfig]] | None = None
+        self._info_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        # An index keeps its space type for life, so this is never expired
+        self._space_types: dict[str, str] = {}
+        self._search_urls: dict[str, str] = {}
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise ImportError(
+                    "h2 package not installed. "
+                    "Install with: pip install 'httpx[http2]'"
+                )
+        # Keep connections alive across tool calls so bursts of concurrent
+        # requests reuse sockets instead of reconnecting.
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=200,
+                    max_keepalive_connections=100,
+                    keepalive_expiry=60.0,
+                ),
+                retries=2,
+            ),
+        )
+    
+    async def _post(self, url: str, payload: Any) -> httpx.Response:
+        """POST a JSON body encoded with orjson."""
+        return await self._post_body(
+            url,
+            orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+            self._headers
+        )
     
-    def _get_headers(self) -> dict[str, str]:
-        """Get request headers with auth if configured."""
-        headers = {"Content-Type": "application/json"}
-        if self.auth_token:
-            headers["Authorization"] = self.auth_token
-        return headers
+    async def _post_body(
+        self, url: str, body: bytes, headers: dict[str, str]
+    ) -> httpx.Response:
+        """POST an encoded body, deflating it first if it is large enough."""
+        if self.compress_requests and len(body) >= self.COMPRESSION_MIN_BYTES:
+            body = zlib.compress(body, 1)
+            headers = {**headers, "Content-Encoding": "deflate"}
+        return await self.client.post(url, headers=headers, content=body)
+    
+    def _search_url(self, index_name: str) -> str:
+        """Return the search URL for an index, formatting it only once."""
+        url = self._search_urls.get(index_name)
+        if url is None:
+            url = self._search_urls[index_name] = (
+                f"{self.base_url}/api/v1/index/{index_name}/search"
+            )
+        return url
+    
+    def _invalidate(self, index_name: str) -> None:
+        """Forget cached state for an index after it was modified."""
+        self._info_cache.pop(index_name, None)
+        if self.semantic_cache is not None:
+            self.semantic_cache.invalidate(index_name)
     
     async def health_check(self) -> dict[str, Any]:
         """Check if Endee server is healthy."""
@@ -63,40 +164,71 @@ class EndeeClient:
         if config.sparse_dimension:
             payload["sparse_dim"] = config.sparse_dimension
         
-        response = await self.client.post(
+        response = await self._post(
             f"{self.base_url}/api/v1/index/create",
-            headers=self._get_headers(),
-            json=payload
+            payload
         )
         response.raise_for_status()
+        self._list_cache = None
         return {"success": True, "message": response.text}
     
     async def list_indexes(self) -> list[IndexConfig]:
-        """List all indexes."""
+        """List all indexes.
+        
+        The listing is reused for ``cache_ttl`` seconds and dropped when
+        this client creates or deletes an index.
+        """
+        if self._list_cache is not None:
+            ts, indexes = self._list_cache
+            if time.monotonic() - ts < self.cache_ttl:
+                return indexes
         response = await self.client.get(
             f"{self.base_url}/api/v1/index/list",
-            headers=self._get_headers()
+            headers=self._headers
         )
         response.raise_for_status()
         data = response.json()
-        return [IndexConfig(**idx) for idx in data.get("indexes", [])]
+        indexes = IndexConfigListAdapter.validate_python(data.get("indexes", []))
+        self._list_cache = (time.monotonic(), indexes)
+        return indexes
     
     async def get_index_info(self, name: str) -> dict[str, Any]:
-        """Get information about an index."""
+        """Get information about an index.
+        
+        The result is reused for ``cache_ttl`` seconds and dropped when this
+        client modifies the index.
+        """
+        cached = self._info_cache.get(name)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
         response = await self.client.get(
             f"{self.base_url}/api/v1/index/{name}/info",
-            headers=self._get_headers()
+            headers=self._headers
         )
         response.raise_for_status()
-        return response.json()
+        info = response.json()
+        self._info_cache[name] = (time.monotonic(), info)
+        if "space_type" in info:
+            self._space_types[name] = info["space_type"]
+        return info
+    
+    async def _is_cosine(self, index_name: str) -> bool:
+        """Whether an index uses cosine space (vectors must be unit length)."""
+        space_type = self._space_types.get(index_name)
+        if space_type is None:
+            space_type = (await self.get_index_info(index_name)).get("space_type")
+        return space_type == "cosine"
     
     async def delete_index(self, name: str) -> dict[str, Any]:
         """Delete an index."""
         response = await self.client.delete(
             f"{self.base_url}/api/v1/index/{name}/delete",
-            headers=self._get_headers()
+            headers=self._headers
         )
         response.raise_for_status()
+        self._list_cache = None
+        self._space_types.pop(name, None)
+        self._invalidate(name)
         return {"success": True, "message": response.text}
     
     async def upsert_vectors(
@@ -104,39 +236,256 @@ class EndeeClient:
         index_name: str, 
         vectors: list[dict[str, Any]]
     ) -> dict[str, Any]:
-        """Upsert vectors into an index."""
-        response = await self.client.post(
+        """Upsert vectors into an index.
+        
+        Dense-only batches whose vectors share one dimension are sent as a
+        single float32 byte matrix (4 bytes per element, no per-float
+        encoding). Anything else, such as hybrid vectors, is sent as msgpack
+        in the server's positional object layout, with floats packed as float32.
+        
+        For cosine indexes, dense vectors are L2-normalized and sent with
+        their original norms, as ``upsert_vectors_int8`` does.
+        """
+        normalize = await self._is_cosine(index_name)
+        payload = self._pack_float32_batch(vectors, normalize)
+        if payload is None:
+            payload = [self._pack_vector(v, normalize) for v in vectors]
+        body = msgpack.packb(payload, use_bin_type=True, use_single_float=True)
+        response = await self._post_body(
             f"{self.base_url}/api/v1/index/{index_name}/vector/insert",
-            headers={**self._get_headers(), "Content-Type": "application/json"},
-            json=vectors
+            body,
+            self._msgpack_headers
         )
         response.raise_for_status()
+        self._invalidate(index_name)
         return {"success": response.status_code == 200}
     
+    async def upsert_vectors_int8(
+        self,
+        index_name: str,
+        ids: list[str],
+        vectors: np.ndarray,
+        meta: list[dict[str, Any] | None] | None = None,
+        filters: list[dict[str, Any] | None] | None = None,
+    ) -> dict[str, Any]:
+        """Upsert vectors quantized to int8 on the client.
+        
+        Rows are quantized with a per-row scale, so each element costs one
+        byte on the wire. Meant for ``int8d`` indexes, where the server keeps
+        int8 precision anyway. For cosine indexes, rows are L2-normalized
+        first and sent with their original norms; other space types keep
+        each row's magnitude.
+        
+        Args:
+            index_name: Target index name
+            ids: Vector IDs, one per row
+            vectors: Array of shape (N, dim)
+            meta: Optional metadata per row
+            filters: Optional filter fields per row
+        
+        Returns:
+            Success status
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = None
+        if await self._is_cosine(index_name):
+            matrix, norms = normalize_rows(matrix)
+        codes, scales = quantize_int8(matrix)
+        payload: dict[str, Any] = {
+            "ids": [str(i) for i in ids],
+            "dim": int(codes.shape[1]),
+            "q": codes.tobytes(),
+            "scales": scales.tolist(),
+        }
+        if norms is not None:
+            payload["norms"] = norms.tolist()
+        if meta is not None:
+            payload["meta"] = [self._pack_meta(m) for m in meta]
+        if filters is not None:
+            payload["filter"] = [self._pack_filter(f) for f in filters]
+        
+        response = await self._post_body(
+            f"{self.base_url}/api/v1/index/{index_name}/vector/insert",
+            msgpack.packb(payload, use_bin_type=True, use_single_float=True),
+            self._msgpack_headers
+        )
+        response.raise_for_status()
+        self._invalidate(index_name)
+        return {"success": response.status_code == 200}
+    
+    async def upsert_vectors_float32(
+        self,
+        index_name: str,
+        ids: list[str],
+        vectors: np.ndarray | list[Any],
+        meta: list[dict[str, Any] | None] | None = None,
+        filters: list[dict[str, Any] | None] | None = None,
+    ) -> dict[str, Any]:
+        """Upsert dense vectors given column-wise.
+        
+        Uses the same float32 matrix format as dense ``upsert_vectors``
+        batches, without building a dict per vector first. For cosine
+        indexes, rows are L2-normalized and sent with their original norms.
+        
+        Args:
+            index_name: Target index name
+            ids: Vector IDs, one per row
+            vectors: Array of shape (N, dim), or N equal-length rows
+            meta: Optional metadata per row
+            filters: Optional filter fields per row
+        
+        Returns:
+            Success status
+        
+        Raises:
+            ValueError: If the rows do not share one dimension
+        """
+        payload = self._pack_float32_columns(
+            ids, vectors, meta, filters, await self._is_cosine(index_name)
+        )
+        response = await self._post_body(
+            f"{self.base_url}/api/v1/index/{index_name}/vector/insert",
+            msgpack.packb(payload, use_bin_type=True),
+            self._msgpack_headers
+        )
+        response.raise_for_status()
+        self._invalidate(index_name)
+        return {"success": response.status_code == 200}
+    
+    @classmethod
+    def _pack_float32_columns(
+        cls,
+        ids: list[Any],
+        vectors: np.ndarray | list[Any],
+        meta: list[dict[str, Any] | None] | None = None,
+        filters: list[dict[str, Any] | None] | None = None,
+        normalize: bool = False,
+    ) -> dict[str, Any]:
+        """Pack columns as {"ids", "dim", "v": float32 bytes, "norms", "meta", "filter"}.
+        
+        ``norms`` is only sent with ``normalize``, which L2-normalizes each row.
+        """
+        matrix = np.asarray(vectors, dtype="<f4")
+        if matrix.ndim != 2 or matrix.shape[1] == 0 or matrix.shape[0] != len(ids):
+            raise ValueError("Vectors must be one non-empty row of equal dimension per id")
+        norms = None
+        if normalize:
+            matrix, norms = normalize_rows(matrix)
+        payload: dict[str, Any] = {
+            "ids": [str(i) for i in ids],
+            "dim": int(matrix.shape[1]),
+            "v": matrix.astype("<f4", copy=False).tobytes(),
+        }
+        if norms is not None:
+            payload["norms"] = norms.tolist()
+        if meta is not None and any(meta):
+            payload["meta"] = [cls._pack_meta(m) for m in meta]
+        if filters is not None and any(filters):
+            payload["filter"] = [cls._pack_filter(f) for f in filters]
+        return payload
+    
+    @classmethod
+    def _pack_float32_batch(
+        cls, vectors: list[dict[str, Any]], normalize: bool = False
+    ) -> dict[str, Any] | None:
+        """Pack a dense batch as a float32 matrix, or None if it does not fit."""
+        if not vectors or any(
+            v.get("vector") is None or v.get("sparse_indices") or v.get("sparse_values")
+            for v in vectors
+        ):
+            return None
+        try:
+            return cls._pack_float32_columns(
+                [v["id"] for v in vectors],
+                [v["vector"] for v in vectors],
+                [v.get("meta") for v in vectors],
+                [v.get("filter") for v in vectors],
+                normalize,
+            )
+        except ValueError:
+            # Ragged rows
+            return None
+    
+    @staticmethod
+    def _pack_meta(meta: dict[str, Any] | None) -> bytes:
+        """Encode metadata as zlib-compressed JSON, as stored by the server."""
+        return zlib.compress(orjson.dumps(meta)) if meta else b""
+    
+    @staticmethod
+    def _pack_filter(filter_fields: dict[str, Any] | None) -> str:
+        """Encode filter fields as the JSON string the server indexes."""
+        return orjson.dumps(filter_fields).decode() if filter_fields else ""
+    
+    @staticmethod
+    def _encode_query_vector(vector: list[float] | np.ndarray) -> str:
+        """Encode a dense query vector as base64 of its little-endian float32 bytes.
+        
+        Sent as ``vector_b64``, this is about half the size of a JSON number
+        list and the server copies it without parsing each float.
+        """
+        arr = np.ascontiguousarray(vector, dtype="<f4").ravel()
+        return base64.b64encode(arr.tobytes()).decode("ascii")
+    
+    @classmethod
+    def _pack_vector(cls, item: dict[str, Any], normalize: bool = False) -> list[Any]:
+        """Convert a vector dict to [id, meta, filter, norm, vector, sparse_ids, sparse_values].
+        
+        With ``normalize``, a dense vector is sent at unit length with its
+        original norm.
+        """
+        vector = item.get("vector")
+        norm = 1.0
+        if normalize and vector is not None and len(vector):
+            unit, norms = normalize_rows(np.asarray(vector, dtype=np.float32)[None, :])
+            vector, norm = unit[0], float(norms[0])
+        if isinstance(vector, np.ndarray):
+            vector = vector.tolist()
+        return [
+            str(item["id"]),
+            cls._pack_meta(item.get("meta")),
+            cls._pack_filter(item.get("filter")),
+            norm,
+            vector or [],
+            item.get("sparse_indices") or [],
+            item.get("sparse_values") or [],
+        ]
+    
     async def get_vector(
         self, 
         index_name: str, 
         vector_id: str
     ) -> dict[str, Any] | None:
-        """Get a vector by ID."""
-        response = await self.client.post(
+        """Get a vector by ID.
+        
+        Returns:
+            Dict with ``id``, ``meta``, ``filter``, ``norm`` and ``vector``,
+            or None if not found
+        """
+        response = await self._post(
             f"{self.base_url}/api/v1/index/{index_name}/vector/get",
-            headers=self._get_headers(),
-            json={"id": vector_id}
+            {"id": vector_id}
         )
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        # Response is msgpack, need to handle separately
-        return {"raw": response.content}
+        # Response is a msgpack [id, meta, filter, norm, vector] array
+        vector_id, meta, filter_json, norm, vector = _unpackb(response.content)
+        return {
+            "id": vector_id,
+            "meta": self._unpack_meta(meta),
+            "filter": orjson.loads(filter_json) if filter_json else None,
+            "norm": norm,
+            "vector": vector,
+        }
     
     async def delete_vector(self, index_name: str, vector_id: str) -> dict[str, Any]:
         """Delete a vector by ID."""
         response = await self.client.delete(
             f"{self.base_url}/api/v1/index/{index_name}/vector/{vector_id}/delete",
-            headers=self._get_headers()
+            headers=self._headers
         )
         response.raise_for_status()
+        self._invalidate(index_name)
         return {"success": True, "message": response.text}
     
     async def delete_by_filter(
@@ -145,18 +494,20 @@ class EndeeClient:
         filter_conditions: list[dict[str, Any]]
     ) -> dict[str, Any]:
         """Delete vectors matching filter."""
-        response = await self.client.delete(
+        response = await self.client.request(
+            "DELETE",
             f"{self.base_url}/api/v1/index/{index_name}/vectors/delete",
-            headers=self._get_headers(),
-            json={"filter": filter_conditions}
+            headers=self._headers,
+            content=orjson.dumps({"filter": filter_conditions})
         )
         response.raise_for_status()
+        self._invalidate(index_name)
         return {"success": True, "deleted_count": int(response.text.split()[0])}
     
     async def search(
         self,
         index_name: str,
-        vector: list[float] | None = None,
+        vector: list[float] | np.ndarray | None = None,
         sparse_indices: list[int] | None = None,
         sparse_values: list[float] | None = None,
         top_k: int = 10,
@@ -164,48 +515,182 @@ class EndeeClient:
         ef: int = 128,
         include_vectors: bool = False
     ) -> list[SearchResult]:
-        """Search for similar vectors."""
-        payload: dict[str, Any] = {
-            "k": top_k,
-            "ef": ef,
-            "include_vectors": include_vectors,
-        }
+        """Search for similar vectors.
+        
+        ``vector`` may be a list or an ndarray; either is sent as float32
+        bytes instead of a JSON number list.
+        """
+        cache_key = None
+        if (
+            self.semantic_cache is not None
+            and vector is not None
+            and not filter_conditions
+            and not sparse_indices
+        ):
+            cache_key = (index_name, top_k, ef, include_vectors)
+            cached = self.semantic_cache.get(cache_key, vector)
+            if cached is not None:
+                return cached
+        
+        payload = _search_skeleton(top_k, ef, include_vectors).copy()
         
-        if vector:
-            payload["vector"] = vector
+        if vector is not None and len(vector):
+            payload["vector_b64"] = self._encode_query_vector(vector)
         
         if sparse_indices and sparse_values:
             payload["sparse_indices"] = sparse_indices
             payload["sparse_values"] = sparse_values
         
         if filter_conditions:
-            payload["filter"] = json.dumps(filter_conditions)
+            payload["filter"] = filter_conditions
         
-        response = await self.client.post(
-            f"{self.base_url}/api/v1/index/{index_name}/search",
-            headers=self._get_headers(),
-            json=payload
+        response = await self._post(
+            self._search_url(index_name),
+            payload
         )
         response.raise_for_status()
         # Response is msgpack, parse it
-        return self._parse_search_response(response.content)
+        results = self._parse_search_response(response.content)
+        if cache_key is not None:
+            self.semantic_cache.put(cache_key, vector, results)
+        return results
     
-    def _parse_search_response(self, data: bytes) -> list[SearchResult]:
-        """Parse msgpack search response."""
+    async def batch_search(
+        self,
+        index_name: str,
+        queries: list[dict[str, Any]],
+        ef: int = 128,
+        include_vectors: bool = False,
+        max_batch: int = 256,
+    ) -> list[list[SearchResult]]:
+        """Run several searches against one index in a single request.
+        
+        Args:
+            index_name: Name of the index to search
+            queries: Query objects with ``vector`` (list or ndarray) and optional ``k``,
+                ``sparse_indices``/``sparse_values`` and ``filter``
+            ef: Search quality parameter shared by all queries
+            include_vectors: Include vector data
+            max_batch: Queries per request; longer lists are split and sent concurrently
+        
+        Returns:
+            One list of results per query, in input order
+        """
+        if len(queries) > max_batch:
+            chunks = await asyncio.gather(*(
+                self.batch_search(
+                    index_name, queries[i:i + max_batch], ef, include_vectors, max_batch
+                )
+                for i in range(0, len(queries), max_batch)
+            ))
+            return [results for chunk in chunks for results in chunk]
+        
+        batch = []
+        for query in queries:
+            item: dict[str, Any] = {"k": query.get("k", 10)}
+            vector = query.get("vector")
+            if vector is not None and len(vector):
+                item["vector_b64"] = self._encode_query_vector(vector)
+            if query.get("sparse_indices") and query.get("sparse_values"):
+                item["sparse_indices"] = query["sparse_indices"]
+                item["sparse_values"] = query["sparse_values"]
+            if query.get("filter"):
+                item["filter"] = query["filter"]
+            batch.append(item)
+        
+        response = await self._post(
+            self._search_url(index_name) + "/batch",
+            {"queries": batch, "ef": ef, "include_vectors": include_vectors}
+        )
+        response.raise_for_status()
+        # Response is msgpack: one result set per query
+        return self._parse_batch_search_response(response.content)
+    
+    @staticmethod
+    def _unpack_meta(meta: bytes) -> dict[str, Any] | None:
+        """Decode metadata stored as zlib-compressed (or plain) JSON."""
+        if not meta:
+            return None
+        try:
+            meta = zlib.decompress(meta)
+        except zlib.error:
+            pass
+        return orjson.loads(meta)
+    
+    @classmethod
+    def _unpack_result(cls, row: list[Any]) -> SearchResult:
+        """Build a SearchResult from [similarity, id, meta, filter, norm, vector]."""
+        similarity, vector_id, meta, filter_json, _norm, vector = row
+        return SearchResult.from_packed(
+            vector_id,
+            similarity,
+            cls._unpack_meta(meta),
+            orjson.loads(filter_json) if filter_json else None,
+            vector or None,
+        )
+    
+    async def search_stream(
+        self,
+        index_name: str,
+        queries: list[dict[str, Any]],
+        top_k: int = 10,
+        window: int = 8,
+    ) -> AsyncIterator[tuple[int, list[SearchResult]]]:
+        """Run searches with a sliding window of requests in flight.
+        
+        Results are yielded as soon as each search finishes, so the caller
+        can process one result set while later searches are still running.
+        
+        Args:
+            index_name: Name of the index to search
+            queries: Query objects in the ``batch_search`` format
+            top_k: Default number of results for queries without ``k``
+            window: Maximum number of concurrent searches
+        
+        Yields:
+            Tuples of (query position, results), in completion order
+        """
+        def start(position: int) -> asyncio.Task:
+            query = queries[position]
+            task = asyncio.create_task(self.search(
+                index_name,
+                vector=query.get("vector"),
+                sparse_indices=query.get("sparse_indices"),
+                sparse_values=query.get("sparse_values"),
+                top_k=query.get("k", top_k),
+                filter_conditions=query.get("filter"),
+            ))
+            positions[task] = position
+            return task
+        
+        positions: dict[asyncio.Task, int] = {}
+        pending = {start(i) for i in range(min(window, len(queries)))}
+        next_position = len(pending)
         try:
-            import msgpack
-            results = msgpack.unpackb(data, raw=False)
-            return [SearchResult(**r) for r in results]
-        except ImportError:
-            # Fallback if msgpack not available
-            return []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if next_position < len(queries):
+                        pending.add(start(next_position))
+                        next_position += 1
+                    yield positions.pop(task), task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _parse_search_response(self, data: bytes) -> list[SearchResult]:
+        """Parse msgpack search response (ormsgpack when installed)."""
+        return [self._unpack_result(row) for row in _unpackb(data)]
+    
+    def _parse_batch_search_response(self, data: bytes) -> list[list[SearchResult]]:
+        """Parse msgpack batch search response."""
+        return [[self._unpack_result(row) for row in rows] for rows in _unpackb(data)]
     
     async def create_backup(self, index_name: str, backup_name: str) -> dict[str, Any]:
         """Create a backup of an index."""
-        response = await self.client.post(
+        response = await self._post(
             f"{self.base_url}/api/v1/index/{index_name}/backup",
-            headers=self._get_headers(),
-            json={"name": backup_name}
+            {"name": backup_name}
         )
         response.raise_for_status()
         return {"success": True, "message": response.text}
@@ -214,7 +699,7 @@ class EndeeClient:
         """List all backups."""
         response = await self.client.get(
             f"{self.base_url}/api/v1/backups",
-            headers=self._get_headers()
+            headers=self._headers
         )
         response.raise_for_status()
         return response.json().get("backups", [])
@@ -225,19 +710,19 @@ class EndeeClient:
         target_index_name: str
     ) -> dict[str, Any]:
         """Restore a backup to a new index."""
-        response = await self.client.post(
+        response = await self._post(
             f"{self.base_url}/api/v1/backups/{backup_name}/restore",
-            headers=self._get_headers(),
-            json={"target_index_name": target_index_name}
+            {"target_index_name": target_index_name}
         )
         response.raise_for_status()
+        self._list_cache = None
         return {"success": True, "message": response.text}
     
     async def delete_backup(self, backup_name: str) -> dict[str, Any]:
         """Delete a backup."""
         response = await self.client.delete(
             f"{self.base_url}/api/v1/backups/{backup_name}",
-            headers=self._get_headers()
+            headers=self._headers
         )
         response.raise_for_status()
         return {"success": True, "message": response.text}
@@ -256,14 +741,20 @@ class EndeeClient:
         Returns:
             Updated count
         """
-        response = await self.client.post(
+        response = await self._post(
             f"{self.base_url}/api/v1/index/{index_name}/filters/update",
-            headers=self._get_headers(),
-            json={"updates": updates}
+            {"updates": updates}
         )
         response.raise_for_status()
+        self._invalidate(index_name)
         return {"success": True, "message": response.text}
 
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
+    
+    async def __aenter__(self) -> "EndeeClient":
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
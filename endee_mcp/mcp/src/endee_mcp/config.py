@@ -1,44 +1,114 @@
 """Endee MCP Framework - Configuration management."""
 
+import functools
 import os
 from dataclasses import dataclass, field
 from typing import Literal
 
+_TRUE = frozenset({"1", "true", "yes", "on"})
 
-@dataclass
+
+def _env_bool(name: str, default: str = "false") -> bool:
+    """Read a boolean environment variable (1/true/yes/on, any case)."""
+    return os.environ.get(name, default).lower() in _TRUE
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Configuration for Endee MCP server."""
+    """Configuration for Endee MCP server.
+    
+    Instances are immutable; use ``dataclasses.replace`` to derive a
+    modified copy. Values derived from the fields are computed once in
+    ``__post_init__``.
+    """
     
     # Endee connection
     endee_url: str = field(default="http://localhost:8080")
     endee_auth_token: str = field(default="")
+    endee_http2: bool = field(default=False)
+    import_concurrency: int = field(default=4)
     
     # Embedding configuration
     embedding_provider: Literal["auto", "openai", "local", "none"] = field(default="auto")
+    embed_batch_size: int = field(default=96)
     
     # OpenAI settings
     openai_api_key: str = field(default="")
     openai_embedding_model: str = field(default="text-embedding-3-small")
+    openai_concurrency: int = field(default=8)
     
     # Local embedding settings
     local_embedding_model: str = field(default="sentence-transformers/all-MiniLM-L6-v2")
     preload_local_model: bool = field(default=False)
+    local_model_idle_sec: float = field(default=300.0)
+    local_embed_fp16: bool = field(default=False)
+    local_embed_backend: Literal["sentence_transformers", "fastembed"] = field(default="sentence_transformers")
+    
+    # Embedding cache settings
+    query_cache_size: int = field(default=4096)
+    embed_cache_size: int = field(default=10000)
+    cache_dir: str = field(default="")
+    embed_cache_normalize: bool = field(default=False)
+    
+    # Query embedding batching
+    embed_query_max_batch: int = field(default=32)
+    embed_query_max_delay_ms: float = field(default=5.0)
     
     # MCP transport
     mcp_transport: Literal["stdio", "sse"] = field(default="stdio")
     mcp_sse_port: int = field(default=3000)
     
+    # Derived in __post_init__
+    _actual_provider: str = field(init=False, repr=False, compare=False)
+    _display: dict = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        if self.embedding_provider == "auto":
+            actual = "openai" if self.openai_api_key else "local"
+        else:
+            actual = self.embedding_provider
+        object.__setattr__(self, "_actual_provider", actual)
+        object.__setattr__(self, "_display", {
+            "endee_url": self.endee_url,
+            "endee_auth_enabled": bool(self.endee_auth_token),
+            "embedding_provider": self.embedding_provider,
+            "embedding_provider_actual": actual,
+            "openai_model": self.openai_embedding_model,
+            "local_model": self.local_embedding_model,
+            "openai_key_configured": bool(self.openai_api_key),
+            "mcp_transport": self.mcp_transport,
+            "mcp_sse_port": self.mcp_sse_port,
+        })
+    
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def from_env(cls) -> "Config":
-        """Load configuration from environment variables."""
+        """Load configuration from environment variables.
+        
+        The result is cached: later calls return the same instance. Call
+        ``Config.from_env.cache_clear()`` to re-read a changed environment.
+        """
         return cls(
             endee_url=os.getenv("ENDEE_URL", "http://localhost:8080"),
             endee_auth_token=os.getenv("ENDEE_AUTH_TOKEN", ""),
+            endee_http2=_env_bool("ENDEE_HTTP2"),
+            import_concurrency=int(os.getenv("IMPORT_CONCURRENCY", "4")),
             embedding_provider=os.getenv("EMBEDDING_PROVIDER", "auto"),  # type: ignore
+            embed_batch_size=int(os.getenv("EMBED_BATCH_SIZE", "96")),
             openai_api_key=os.getenv("OPENAI_API_KEY", ""),
             openai_embedding_model=os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
+            openai_concurrency=int(os.getenv("OPENAI_CONCURRENCY", "8")),
             local_embedding_model=os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
-            preload_local_model=os.getenv("PRELOAD_LOCAL_MODEL", "false").lower() == "true",
+            preload_local_model=_env_bool("PRELOAD_LOCAL_MODEL"),
+            local_model_idle_sec=float(os.getenv("LOCAL_MODEL_IDLE_SEC", "300")),
+            local_embed_fp16=_env_bool("LOCAL_EMBED_FP16"),
+            local_embed_backend=os.getenv("LOCAL_EMBED_BACKEND", "sentence_transformers"),  # type: ignore
+            query_cache_size=int(os.getenv("QUERY_CACHE_SIZE", "4096")),
+            embed_cache_size=int(os.getenv("EMBED_CACHE_SIZE", "10000")),
+            cache_dir=os.getenv("ENDEE_CACHE_DIR", ""),
+            embed_cache_normalize=_env_bool("EMBED_CACHE_NORMALIZE"),
+            embed_query_max_batch=int(os.getenv("EMBED_QUERY_MAX_BATCH", "32")),
+            embed_query_max_delay_ms=float(os.getenv("EMBED_QUERY_MAX_DELAY_MS", "5")),
             mcp_transport=os.getenv("MCP_TRANSPORT", "stdio"),  # type: ignore
             mcp_sse_port=int(os.getenv("MCP_SSE_PORT", "3000")),
         )
@@ -53,23 +123,9 @@ class Config:
     
     def get_embedding_provider(self) -> Literal["openai", "local", "none"]:
         """Get the actual embedding provider to use."""
-        if self.embedding_provider == "auto":
-            if self.is_openai_configured():
-                return "openai"
-            else:
-                return "local"
-        return self.embedding_provider  # type: ignore
+        return self._actual_provider  # type: ignore
     
     def to_dict(self) -> dict:
         """Convert config to dictionary (for display)."""
-        return {
-            "endee_url": self.endee_url,
-            "endee_auth_enabled": self.is_auth_enabled(),
-            "embedding_provider": self.embedding_provider,
-            "embedding_provider_actual": self.get_embedding_provider(),
-            "openai_model": self.openai_embedding_model,
-            "local_model": self.local_embedding_model,
-            "openai_key_configured": self.is_openai_configured(),
-            "mcp_transport": self.mcp_transport,
-            "mcp_sse_port": self.mcp_sse_port,
-        }
+        # Copy so callers cannot change the cached view
+        return dict(self._display)
@@ -0,0 +1,52 @@
+"""Endee MCP Framework - Shared objects handed to tool functions."""
+
+import functools
+import inspect
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from .client import EndeeClient
+from .config import Config
+from .embeddings import EmbeddingManager
+
+
+@dataclass(frozen=True, slots=True)
+class ToolContext:
+    """Server-wide objects every tool needs, created once at startup.
+    
+    Tools take the context as their first argument; ``bind_tool`` hides it
+    from the signature MCP clients see.
+    """
+    
+    config: Config
+    endee_client: EndeeClient
+    embedding_manager: EmbeddingManager
+
+
+def bind_tool(
+    fn: Callable[..., Awaitable[Any]],
+    ctx: ToolContext,
+) -> Callable[..., Awaitable[Any]]:
+    """Bind ``ctx`` as the first argument of a tool function.
+    
+    Unlike a bare ``functools.partial``, the result keeps the tool's name
+    and docstring, and its signature omits ``ctx`` so the generated tool
+    schema only lists the real parameters.
+    
+    Args:
+        fn: Tool coroutine function taking ``ctx`` first
+        ctx: Context to bind
+    
+    Returns:
+        Coroutine function with the remaining parameters
+    """
+    @functools.wraps(fn)
+    async def tool(*args: Any, **kwargs: Any) -> Any:
+        return await fn(ctx, *args, **kwargs)
+    
+    signature = inspect.signature(fn)
+    tool.__signature__ = signature.replace(  # type: ignore[attr-defined]
+        parameters=list(signature.parameters.values())[1:]
+    )
+    del tool.__wrapped__
+    return tool
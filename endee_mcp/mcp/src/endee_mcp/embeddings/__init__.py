@@ -1,8 +1,14 @@
 """Endee MCP Framework - Embedding manager."""
 
+import asyncio
+from pathlib import Path
 from typing import Literal
 
+import numpy as np
+
 from .base import EmbeddingProvider, NoneProvider
+from .batcher import QueryBatcher
+from .cache import CachedEmbedder, DiskEmbeddingCache, LRUCache, normalize_text
 from .openai import OpenAIEmbeddingProvider
 from .local import LocalEmbeddingProvider
 
@@ -17,6 +23,16 @@ class EmbeddingManager:
         openai_model: str = "text-embedding-3-small",
         local_model: str = "sentence-transformers/all-MiniLM-L6-v2",
         preload_local: bool = False,
+        query_cache_size: int = 4096,
+        embed_cache_size: int = 10000,
+        cache_dir: str | None = None,
+        openai_concurrency: int = 8,
+        local_idle_timeout: float = 300.0,
+        query_max_batch: int = 32,
+        query_max_delay_ms: float = 5.0,
+        normalize_cache_keys: bool = False,
+        local_fp16: bool = False,
+        local_backend: Literal["sentence_transformers", "fastembed"] = "sentence_transformers",
     ):
         """Initialize embedding manager.
         
@@ -26,13 +42,54 @@ class EmbeddingManager:
             openai_model: OpenAI model name
             local_model: Local model name
             preload_local: Whether to preload local model
+            query_cache_size: Number of query embeddings to keep (0 disables)
+            embed_cache_size: Number of text embeddings each provider keeps (0 disables)
+            cache_dir: Directory for the persistent import embedding cache (None disables)
+            openai_concurrency: Maximum concurrent OpenAI embedding requests
+            local_idle_timeout: Seconds before an unused local model is unloaded (0 disables)
+            query_max_batch: Concurrent queries embedded in one call (1 disables batching)
+            query_max_delay_ms: Milliseconds a query waits for others while a batch runs
+            normalize_cache_keys: Let texts differing only in case, whitespace or trailing
+                punctuation share cached embeddings
+            local_fp16: Run the local model in half precision on GPU
+            local_backend: Runtime for local models (sentence_transformers or fastembed)
+        
+        With ``preload_local`` inside a running event loop, the local model is
+        loaded and warmed up by a background task so startup does not wait for it.
         """
         self.provider_type = provider_type
         self.openai_api_key = openai_api_key
         self.openai_model = openai_model
         self.local_model = local_model
         self.preload_local = preload_local
+        self.embed_cache_size = embed_cache_size
+        self.openai_concurrency = openai_concurrency
+        self.local_idle_timeout = local_idle_timeout
+        self.query_max_batch = query_max_batch
+        self.query_max_delay_ms = query_max_delay_ms
+        self.normalize_cache_keys = normalize_cache_keys
+        self.local_fp16 = local_fp16
+        self.local_backend = local_backend
+        self._query_batcher: QueryBatcher | None = None
         self._provider: EmbeddingProvider | None = None
+        self.query_cache = LRUCache(query_cache_size)
+        self.disk_cache = (
+            DiskEmbeddingCache(Path(cache_dir) / "embeddings.sqlite3") if cache_dir else None
+        )
+        self._preload_task: asyncio.Task | None = None
+        if preload_local:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._preload_task = loop.create_task(self._preload())
+    
+    async def _preload(self) -> None:
+        """Load the local model in the background, if it is the active provider."""
+        provider = self.get_provider()
+        if isinstance(provider, LocalEmbeddingProvider):
+            await provider.load()
     
     def get_provider(self) -> EmbeddingProvider:
         """Get the appropriate embedding provider.
@@ -60,18 +117,65 @@ class EmbeddingManager:
                 raise ValueError("OpenAI API key not configured")
             self._provider = OpenAIEmbeddingProvider(
                 api_key=self.openai_api_key,
-                model=self.openai_model
+                model=self.openai_model,
+                cache_size=self.embed_cache_size,
+                normalize_keys=self.normalize_cache_keys,
+                concurrency=self.openai_concurrency,
             )
         elif actual_type == "local":
             self._provider = LocalEmbeddingProvider(
                 model_name=self.local_model,
-                preload=self.preload_local
+                # Loaded by the background preload task when one is running
+                preload=self.preload_local and self._preload_task is None,
+                cache_size=self.embed_cache_size,
+                normalize_keys=self.normalize_cache_keys,
+                idle_timeout=self.local_idle_timeout,
+                fp16=self.local_fp16,
+                backend=self.local_backend,
             )
         else:
             raise ValueError(f"Unknown provider type: {actual_type}")
         
         return self._provider
     
+    def get_import_provider(self) -> EmbeddingProvider:
+        """Get the provider for bulk writes, backed by the disk cache if configured.
+        
+        Used by the import tools and ``endee_upsert_documents``.
+        
+        Returns:
+            EmbeddingProvider instance
+        """
+        provider = self.get_provider()
+        if self.disk_cache is None:
+            return provider
+        return CachedEmbedder(provider, self.disk_cache, self.normalize_cache_keys)
+    
+    async def embed_query_cached(self, text: str) -> np.ndarray:
+        """Embed a query text, reusing the embedding of repeated queries.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        provider = self.get_provider()
+        key = (provider.provider_name, normalize_text(text) if self.normalize_cache_keys else text)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            if self.query_max_batch > 1:
+                if self._query_batcher is None or self._query_batcher.provider is not provider:
+                    self._query_batcher = QueryBatcher(
+                        provider, self.query_max_batch, self.query_max_delay_ms / 1000
+                    )
+                # Concurrent queries share one model call
+                embedding = await self._query_batcher.embed(text)
+            else:
+                embedding = await provider.embed_query(text)
+            self.query_cache.put(key, embedding)
+        return embedding
+    
     def get_dimension(self) -> int:
         """Get the dimension of embeddings."""
         return self.get_provider().dimension
@@ -86,3 +190,10 @@ class EmbeddingManager:
         if isinstance(provider, LocalEmbeddingProvider):
             return provider.is_loaded()
         return False
+    
+    def is_local_model_warmed(self) -> bool:
+        """Check if the local model has run its warm-up batch (if using local provider)."""
+        provider = self.get_provider()
+        if isinstance(provider, LocalEmbeddingProvider):
+            return provider.warmed
+        return False
@@ -3,6 +3,8 @@
 from abc import ABC, abstractmethod
 from typing import Literal
 
+import numpy as np
+
 
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
@@ -19,27 +21,42 @@ class EmbeddingProvider(ABC):
         """Dimension of the embeddings."""
         pass
     
+    @property
+    @abstractmethod
+    def active_model(self) -> str:
+        """Name of the model that produces the embeddings."""
+        pass
+    
+    @property
+    def cache_id(self) -> str:
+        """Identifies the embeddings this provider produces, for persistent cache keys.
+        
+        Providers whose output depends on more than the model (such as a
+        normalization flag or backend) include that too.
+        """
+        return f"{self.provider_name}:{self.active_model}:{self.dimension}"
+    
     @abstractmethod
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    async def embed_texts(self, texts: list[str]) -> np.ndarray:
         """Embed multiple texts.
         
         Args:
             texts: List of texts to embed
             
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimension)
         """
         pass
     
     @abstractmethod
-    async def embed_query(self, text: str) -> list[float]:
+    async def embed_query(self, text: str) -> np.ndarray:
         """Embed a single query text.
         
         Args:
             text: Text to embed
             
         Returns:
-            Embedding vector
+            float32 embedding vector
         """
         pass
 
@@ -55,8 +72,12 @@ class NoneProvider(EmbeddingProvider):
     def dimension(self) -> int:
         return 0
     
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    @property
+    def active_model(self) -> str:
+        return "none"
+    
+    async def embed_texts(self, texts: list[str]) -> np.ndarray:
         raise RuntimeError("Embedding provider is disabled")
     
-    async def embed_query(self, text: str) -> list[float]:
+    async def embed_query(self, text: str) -> np.ndarray:
         raise RuntimeError("Embedding provider is disabled")
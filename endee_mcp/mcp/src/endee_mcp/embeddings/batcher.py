@@ -0,0 +1,82 @@
+"""Endee MCP Framework - Micro-batching for query embeddings."""
+
+import asyncio
+
+import numpy as np
+
+from .base import EmbeddingProvider
+
+
+class QueryBatcher:
+    """Coalesce concurrent ``embed_query`` calls into one ``embed_texts`` call.
+    
+    A query that arrives while nothing is being embedded is flushed on the
+    next loop iteration, so a lone query waits for no timer. Queries that
+    arrive while a batch is running wait up to ``max_delay`` seconds (or
+    until ``max_batch`` are queued) and go out together.
+    """
+    
+    def __init__(self, provider: EmbeddingProvider, max_batch: int = 32, max_delay: float = 0.005):
+        """Initialize the batcher.
+        
+        Args:
+            provider: Provider that embeds each batch
+            max_batch: Maximum queries per model call
+            max_delay: Seconds a query waits for others while a batch is running
+        """
+        self.provider = provider
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._in_flight: set[asyncio.Task] = set()
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one query text as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            if self._in_flight:
+                self._flush_handle = loop.call_later(self.max_delay, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+        return await future
+    
+    def _flush(self) -> None:
+        """Start embedding everything queued so far."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+    
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        # The same query sent twice in a burst is embedded once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            if len(texts) == 1:
+                embeddings = [await self.provider.embed_query(texts[0])]
+            else:
+                embeddings = await self.provider.embed_texts(texts)
+            
+            position = {text: i for i, text in enumerate(texts)}
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(embeddings[position[text]])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancelled mid-batch (e.g. at loop shutdown): cancel the waiting
+            # callers instead of leaving them hanging
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
@@ -0,0 +1,264 @@
+"""Endee MCP Framework - Embedding caches."""
+
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable
+
+import numpy as np
+
+from .base import EmbeddingProvider
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int = 4096):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value and mark it as recently used."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the oldest entry when full."""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Fold case, whitespace and trailing punctuation so near-duplicates match."""
+    return _WHITESPACE.sub(" ", text.strip().lower()).rstrip(".!?,;:").rstrip()
+
+
+def text_key(model: str, text: str, normalize: bool = False) -> bytes:
+    """Cache key for a text embedded by a given model.
+    
+    With ``normalize``, texts that differ only in case, whitespace or
+    trailing punctuation share a key (and therefore an embedding).
+    """
+    if normalize:
+        text = normalize_text(text)
+    return hashlib.sha256(f"{model}\0{text}".encode()).digest()
+
+
+def _assemble(
+    n: int,
+    hits: dict[int, np.ndarray],
+    miss_indices: list[int],
+    embeddings: np.ndarray | None,
+) -> np.ndarray:
+    """Stack cached rows and fresh embeddings into one (n, dim) array."""
+    if not hits:
+        return embeddings if embeddings is not None else np.empty((0, 0), dtype=np.float32)
+    dim = next(iter(hits.values())).shape[0]
+    out = np.empty((n, dim), dtype=np.float32)
+    for i, row in hits.items():
+        out[i] = row
+    if embeddings is not None:
+        out[miss_indices] = embeddings
+    return out
+
+
+async def embed_with_cache(
+    cache: LRUCache,
+    model: str,
+    texts: list[str],
+    embed: Callable[[list[str]], Awaitable[np.ndarray]],
+    normalize: bool = False,
+) -> np.ndarray:
+    """Embed texts, sending only cache misses to ``embed``.
+    
+    Args:
+        cache: Cache of float32 embedding rows keyed by ``text_key``
+        model: Model identifier included in every key
+        texts: Texts to embed
+        embed: Coroutine that embeds a list of texts into an (N, dim) array
+        normalize: Key on ``normalize_text`` of each text instead of the exact text
+    
+    Returns:
+        float32 array of shape (len(texts), dim), in the order of ``texts``
+    """
+    hits: dict[int, np.ndarray] = {}
+    miss_indices = []
+    miss_texts = []
+    for i, text in enumerate(texts):
+        embedding = cache.get(text_key(model, text, normalize))
+        if embedding is None:
+            miss_indices.append(i)
+            miss_texts.append(text)
+        else:
+            hits[i] = embedding
+    
+    embeddings = None
+    if miss_texts:
+        embeddings = np.asarray(await embed(miss_texts), dtype=np.float32)
+        for text, row in zip(miss_texts, embeddings):
+            # Copy so a cached row does not keep the whole batch alive
+            cache.put(text_key(model, text, normalize), row.copy())
+    
+    return _assemble(len(texts), hits, miss_indices, embeddings)
+
+
+class DiskEmbeddingCache:
+    """Embeddings persisted in SQLite so they survive restarts.
+    
+    Vectors are stored as float32 bytes under ``text_key`` keys. Methods
+    may be called from any thread (``CachedEmbedder`` runs them off the
+    event loop); a lock serializes access to the connection.
+    """
+    
+    def __init__(self, path: str | Path, batch_size: int = 500):
+        """Open (or create) the cache database.
+        
+        Args:
+            path: SQLite database file
+            batch_size: Keys per lookup query (bounded by SQLite's variable limit)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+    
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Return the cached embeddings for whichever keys are present."""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), self.batch_size):
+                chunk = keys[i:i + self.batch_size]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+    
+    def put_many(self, items: list[tuple[bytes, np.ndarray]]) -> None:
+        """Store embeddings, replacing existing entries."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items],
+            )
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbedder(EmbeddingProvider):
+    """Provider wrapper that consults a disk cache before embedding."""
+    
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        cache: DiskEmbeddingCache,
+        normalize_keys: bool = False,
+    ):
+        """Wrap a provider.
+        
+        Args:
+            provider: Provider used for cache misses
+            cache: Persistent embedding cache
+            normalize_keys: Share entries between texts equal after ``normalize_text``
+        """
+        self.provider = provider
+        self.cache = cache
+        self.normalize_keys = normalize_keys
+    
+    @property
+    def provider_name(self) -> str:
+        return self.provider.provider_name
+    
+    @property
+    def dimension(self) -> int:
+        return self.provider.dimension
+    
+    @property
+    def active_model(self) -> str:
+        return self.provider.active_model
+    
+    @property
+    def cache_id(self) -> str:
+        return self.provider.cache_id
+    
+    async def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Embed texts, sending only those missing from disk to the provider.
+        
+        SQLite reads and writes run in a worker thread, off the event loop.
+        """
+        cache_id = self.provider.cache_id
+        keys = [text_key(cache_id, text, self.normalize_keys) for text in texts]
+        found = await asyncio.to_thread(self.cache.get_many, keys)
+        
+        hits = {i: found[key] for i, key in enumerate(keys) if key in found}
+        miss_indices = [i for i in range(len(keys)) if i not in hits]
+        embeddings = None
+        if miss_indices:
+            embeddings = np.asarray(
+                await self.provider.embed_texts([texts[i] for i in miss_indices]),
+                dtype=np.float32,
+            )
+            await asyncio.to_thread(
+                self.cache.put_many, [(keys[i], row) for i, row in zip(miss_indices, embeddings)]
+            )
+        
+        return _assemble(len(texts), hits, miss_indices, embeddings)
+    
+    async def embed_query(self, text: str) -> np.ndarray:
+        """Embed a single query text."""
+        embeddings = await self.embed_texts([text])
+        return embeddings[0]
@@ -1,13 +1,28 @@
 """Endee MCP Framework - Local embedding provider using sentence-transformers."""
 
 import asyncio
-from typing import Any
+import contextlib
+import gc
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal
 
+import numpy as np
+
+from ..quantize import normalize_rows
 from .base import EmbeddingProvider
+from .cache import LRUCache, embed_with_cache
 
 
 class LocalEmbeddingProvider(EmbeddingProvider):
-    """Local embedding provider using sentence-transformers."""
+    """Local embedding provider using sentence-transformers.
+    
+    The ``fastembed`` backend runs the same models as quantized ONNX graphs
+    through onnxruntime instead, which is faster on CPU and does not load
+    torch at all.
+    """
     
     MODEL_DIMENSIONS = {
         "sentence-transformers/all-MiniLM-L6-v2": 384,
@@ -16,15 +31,52 @@ class LocalEmbeddingProvider(EmbeddingProvider):
         "BAAI/bge-base-en-v1.5": 768,
     }
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", preload: bool = False):
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        preload: bool = False,
+        batch_size: int = 64,
+        normalize: bool = True,
+        cache_size: int = 10000,
+        normalize_keys: bool = False,
+        idle_timeout: float = 300.0,
+        fp16: bool = False,
+        backend: Literal["sentence_transformers", "fastembed"] = "sentence_transformers",
+    ):
         """Initialize local provider.
         
         Args:
             model_name: HuggingFace model name
             preload: Whether to load model immediately
+            batch_size: Texts per forward pass
+            normalize: L2-normalize embeddings inside encode (what cosine indexes expect)
+            cache_size: Number of text embeddings to keep (0 disables)
+            normalize_keys: Reuse embeddings for texts differing only in case/whitespace/punctuation
+            idle_timeout: Seconds without use before the model is unloaded (0 keeps it loaded)
+            fp16: Run the model in half precision when it is on a GPU
+            backend: ``sentence_transformers`` (torch) or ``fastembed`` (onnxruntime)
         """
+        if backend not in ("sentence_transformers", "fastembed"):
+            raise ValueError(f"Unknown local embedding backend: {backend}")
         self.model_name = model_name
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.cache = LRUCache(cache_size)
+        self.normalize_keys = normalize_keys
+        self.idle_timeout = idle_timeout
+        self.fp16 = fp16
+        self.backend = backend
         self._model = None
+        # Set once a warm-up batch has run on the loaded model
+        self.warmed = False
+        # Replaced by torch.inference_mode once torch is imported
+        self._inference_mode: Any = contextlib.nullcontext
+        # One dedicated worker: the model runs one batch at a time anyway, and
+        # queued calls wait here instead of tying up the loop's default pool
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self._load_lock = threading.Lock()
+        self._last_use = 0.0
+        self._evict_handle: asyncio.TimerHandle | None = None
         self._dimension = self.MODEL_DIMENSIONS.get(model_name, 384)
         
         if preload:
@@ -32,42 +84,142 @@ class LocalEmbeddingProvider(EmbeddingProvider):
     
     @property
     def provider_name(self) -> str:
-        return f"local-{self.model_name.split('/')[-1]}"
+        name = f"local-{self.model_name.split('/')[-1]}"
+        # ONNX output differs slightly, so it must not share cache entries
+        return f"{name}-onnx" if self.backend == "fastembed" else name
     
     @property
     def dimension(self) -> int:
         return self._dimension
     
+    @property
+    def active_model(self) -> str:
+        return self.model_name
+    
+    @property
+    def cache_id(self) -> str:
+        # Full model id: two models may share the last path segment
+        norm = "norm" if self.normalize else "raw"
+        return f"local:{self.backend}:{self.model_name}:{norm}:{self.dimension}"
+    
     def _load_model(self):
         """Lazy load the sentence-transformers model."""
-        if self._model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                import torch
-                
-                # Use GPU if available
-                device = "cuda" if torch.cuda.is_available() else "cpu"
-                self._model = SentenceTransformer(self.model_name, device=device)
-            except ImportError:
-                raise ImportError(
-                    "sentence-transformers not installed. "
-                    "Install with: pip install sentence-transformers"
-                )
-    
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        """Embed multiple texts locally."""
-        self._load_model()
+        # A background preload and a first query may race to load
+        with self._load_lock:
+            if self._model is None and self.backend == "fastembed":
+                try:
+                    from fastembed import TextEmbedding
+                except ImportError:
+                    raise ImportError(
+                        "fastembed not installed. "
+                        "Install with: pip install endee-mcp[onnx]"
+                    )
+                self._model = TextEmbedding(model_name=self.model_name)
+            elif self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    import torch
+                    
+                    # Use GPU if available
+                    device = "cuda" if torch.cuda.is_available() else "cpu"
+                    model = SentenceTransformer(self.model_name, device=device)
+                    if self.fp16 and device == "cuda":
+                        # ~2x throughput and half the VRAM; output is cast back to float32
+                        model = model.half()
+                    self._model = model
+                    self._inference_mode = torch.inference_mode
+                except ImportError:
+                    raise ImportError(
+                        "sentence-transformers not installed. "
+                        "Install with: pip install sentence-transformers"
+                    )
+            self._last_use = time.monotonic()
+            return self._model
+    
+    async def load(self) -> None:
+        """Load the model and run one warm-up batch without blocking the event loop.
         
-        # Run in thread pool to not block
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None, 
-            lambda: self._model.encode(texts, convert_to_numpy=True).tolist()
+        The warm-up pays first-call costs (kernel selection, lazy allocations)
+        here instead of in the first real request.
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._encode_sync, ["warmup"]
         )
+        self.warmed = True
+        self._schedule_eviction()
+    
+    def _schedule_eviction(self) -> None:
+        """(Re)arm the idle timer that unloads the model."""
+        if self.idle_timeout <= 0:
+            return
+        if self._evict_handle is not None:
+            self._evict_handle.cancel()
+        self._evict_handle = asyncio.get_running_loop().call_later(
+            self.idle_timeout, self._evict_if_idle
+        )
+    
+    def _evict_if_idle(self) -> None:
+        """Unload the model if it has not been used for ``idle_timeout`` seconds."""
+        self._evict_handle = None
+        idle = time.monotonic() - self._last_use
+        if idle < self.idle_timeout:
+            # Used by a call that has not re-armed the timer yet
+            self._evict_handle = asyncio.get_running_loop().call_later(
+                self.idle_timeout - idle, self._evict_if_idle
+            )
+            return
+        with self._load_lock:
+            if self._model is None:
+                return
+            self._model = None
+            self.warmed = False
+        gc.collect()
+        # Only if the model already brought torch in (the fastembed backend never does)
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
+    async def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Embed multiple texts locally, skipping texts already in the cache."""
+        # Normalization changes the output, so it is part of the cache key
+        cache_model = f"{self.model_name}:{'norm' if self.normalize else 'raw'}"
+        return await embed_with_cache(
+            self.cache, cache_model, texts, self._embed_uncached, self.normalize_keys
+        )
+    
+    async def _embed_uncached(self, texts: list[str]) -> np.ndarray:
+        """Run the model on texts.
+        
+        ``encode`` already sorts texts by length internally and batches them
+        ``batch_size`` at a time, so padding stays bounded without sorting here.
+        """
+        # Run on the model's worker thread to not block
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(self._executor, self._encode_sync, texts)
+        self._last_use = time.monotonic()
+        self._schedule_eviction()
         
         return embeddings
     
-    async def embed_query(self, text: str) -> list[float]:
+    def _encode_sync(self, texts: list[str]) -> np.ndarray:
+        """Load the model if needed and encode texts (runs on the worker thread)."""
+        model = self._load_model()
+        if self.backend == "fastembed":
+            embeddings = np.stack(list(model.embed(texts, batch_size=self.batch_size)))
+            if self.normalize:
+                embeddings, _ = normalize_rows(embeddings)
+            return embeddings.astype(np.float32, copy=False)
+        with self._inference_mode():
+            embeddings = model.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=self.normalize,
+                show_progress_bar=False,
+            )
+        return embeddings.astype(np.float32, copy=False)
+    
+    async def embed_query(self, text: str) -> np.ndarray:
         """Embed a single query text."""
         embeddings = await self.embed_texts([text])
         return embeddings[0]
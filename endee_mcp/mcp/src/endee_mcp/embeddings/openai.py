@@ -3,7 +3,11 @@
 import asyncio
 from typing import Any
 
+import httpx
+import numpy as np
+
 from .base import EmbeddingProvider
+from .cache import LRUCache, embed_with_cache
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
@@ -15,16 +19,41 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
         "text-embedding-ada-002": 1536,
     }
     
-    def __init__(self, api_key: str, model: str = "text-embedding-3-small"):
+    # Per-request API limits
+    MAX_BATCH_TEXTS = 2048
+    MAX_BATCH_TOKENS = 300_000
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-small",
+        cache_size: int = 10000,
+        normalize_keys: bool = False,
+        concurrency: int = 8,
+        max_retries: int = 5,
+    ):
         """Initialize OpenAI provider.
         
         Args:
             api_key: OpenAI API key
             model: Model name (text-embedding-3-small, text-embedding-3-large, text-embedding-ada-002)
+            cache_size: Number of text embeddings to keep (0 disables)
+            normalize_keys: Reuse embeddings for texts differing only in case/whitespace/punctuation
+            concurrency: Maximum number of embedding requests in flight
+            max_retries: Retries for a rate-limited request, with exponential backoff
         """
         self.api_key = api_key
         self.model = model
+        self.cache = LRUCache(cache_size)
+        self.normalize_keys = normalize_keys
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
         self._client = None
+        # tiktoken encoding once looked up (False when tiktoken is missing)
+        self._encoding: Any = None
+        # Exceptions worth retrying; set once the openai package is imported
+        self._retryable: tuple[type[Exception], ...] = ()
         self._dimension = self.MODEL_DIMENSIONS.get(model, 1536)
     
     @property
@@ -35,12 +64,30 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
     def dimension(self) -> int:
         return self._dimension
     
+    @property
+    def active_model(self) -> str:
+        return self.model
+    
     def _get_client(self):
         """Lazy initialization of OpenAI client."""
         if self._client is None:
             try:
-                from openai import AsyncOpenAI
-                self._client = AsyncOpenAI(api_key=self.api_key)
+                from openai import AsyncOpenAI, RateLimitError
+                self._client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    # httpx drops idle sockets after 5s by default; keep one per
+                    # allowed request so sparse queries skip the TLS handshake
+                    http_client=httpx.AsyncClient(
+                        timeout=httpx.Timeout(600.0, connect=5.0),
+                        limits=httpx.Limits(
+                            max_connections=100,
+                            max_keepalive_connections=self.concurrency,
+                            keepalive_expiry=60.0,
+                        ),
+                        follow_redirects=True,
+                    ),
+                )
+                self._retryable = (RateLimitError,)
             except ImportError:
                 raise ImportError(
                     "OpenAI package not installed. "
@@ -48,39 +95,97 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
                 )
         return self._client
     
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        """Embed multiple texts using OpenAI API."""
+    async def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Embed multiple texts using OpenAI API.
+        
+        Texts embedded before by the same model are served from the cache;
+        only the rest are sent to the API.
+        """
+        return await embed_with_cache(
+            self.cache, self.model, texts, self._embed_uncached, self.normalize_keys
+        )
+    
+    async def _embed_uncached(self, texts: list[str]) -> np.ndarray:
+        """Embed texts with the API in as few requests as the limits allow, in parallel."""
         client = self._get_client()
         
-        # OpenAI has a limit of 2048 texts per request
-        batch_size = 2048
-        all_embeddings = []
+        if len(texts) == 1:
+            spans = [(0, 1)]
+        else:
+            # Tokenizing a large import is CPU work; keep it off the loop
+            counts = await asyncio.to_thread(self.count_tokens, texts)
+            spans = self._request_spans(counts)
+        batches = await asyncio.gather(*(
+            self._embed_batch(client, texts[start:end]) for start, end in spans
+        ))
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            
-            try:
-                response = await client.embeddings.create(
-                    model=self.model,
-                    input=batch
-                )
-                
-                # Extract embeddings
-                embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(embeddings)
-                
-            except Exception as e:
-                raise RuntimeError(f"OpenAI embedding failed: {e}")
-        
-        return all_embeddings
+        # gather keeps batch order
+        all_embeddings = []
+        for embeddings in batches:
+            all_embeddings.extend(embeddings)
+        return np.asarray(all_embeddings, dtype=np.float32)
+    
+    async def _embed_batch(self, client: Any, batch: list[str]) -> list[list[float]]:
+        """Send one embedding request, retrying with backoff when rate limited."""
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await client.embeddings.create(
+                        model=self.model,
+                        input=batch
+                    )
+                    return [item.embedding for item in response.data]
+                except self._retryable as e:
+                    if attempt == self.max_retries:
+                        raise RuntimeError(f"OpenAI embedding failed: {e}")
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                except Exception as e:
+                    raise RuntimeError(f"OpenAI embedding failed: {e}")
     
-    async def embed_query(self, text: str) -> list[float]:
+    async def embed_query(self, text: str) -> np.ndarray:
         """Embed a single query text."""
         embeddings = await self.embed_texts([text])
         return embeddings[0]
     
+    def _request_spans(self, counts: list[int]) -> list[tuple[int, int]]:
+        """Split texts with these token counts into (start, end) ranges within the API limits."""
+        spans = []
+        start = tokens = 0
+        for i, count in enumerate(counts):
+            if i > start and (
+                i - start == self.MAX_BATCH_TEXTS or tokens + count > self.MAX_BATCH_TOKENS
+            ):
+                spans.append((start, i))
+                start, tokens = i, 0
+            tokens += count
+        spans.append((start, len(counts)))
+        return spans
+    
+    def _get_encoding(self) -> Any | None:
+        """Lazy lookup of the model's tiktoken encoding (None without tiktoken)."""
+        if self._encoding is None:
+            try:
+                import tiktoken
+            except ImportError:
+                self._encoding = False
+            else:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+        return self._encoding or None
+    
+    def count_tokens(self, texts: list[str]) -> list[int]:
+        """Count tokens per text.
+        
+        Exact with ``tiktoken`` installed (encoded in parallel by its Rust
+        core); otherwise estimated at about 4 characters per token.
+        """
+        encoding = self._get_encoding()
+        if encoding is None:
+            return [len(text) // 4 + 1 for text in texts]
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+    
     def estimate_tokens(self, texts: list[str]) -> int:
-        """Estimate token count (rough approximation)."""
-        # Rough estimate: 1 token ≈ 4 characters
-        total_chars = sum(len(text) for text in texts)
-        return total_chars // 4
+        """Estimate the total token count of texts."""
+        return sum(self.count_tokens(texts))
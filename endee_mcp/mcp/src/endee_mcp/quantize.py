@@ -0,0 +1,36 @@
+"""Endee MCP Framework - Client-side vector quantization."""
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """L2-normalize each row of a 2-D array.
+
+    Args:
+        vectors: Array of shape (N, dim)
+
+    Returns:
+        Tuple of (unit vectors as float32, original row norms)
+    """
+    arr = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(arr, axis=1)
+    safe = np.where(norms == 0, 1.0, norms).astype(np.float32)
+    return arr / safe[:, None], norms
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric max-abs int8 quantization, one scale per row.
+
+    Each row is reconstructed as ``codes * scale``.
+
+    Args:
+        vectors: Array of shape (N, dim)
+
+    Returns:
+        Tuple of (int8 codes of shape (N, dim), float32 scales of shape (N,))
+    """
+    arr = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(arr).max(axis=1) / 127.0
+    scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+    codes = np.rint(arr / scales[:, None]).astype(np.int8)
+    return codes, scales
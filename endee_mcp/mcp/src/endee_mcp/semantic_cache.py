@@ -0,0 +1,107 @@
+"""Endee MCP Framework - Semantic search result cache."""
+
+from typing import Hashable
+
+import numpy as np
+
+from .types import SearchResult
+
+
+class SemanticQueryCache:
+    """Reuse search results for query vectors close to an earlier query.
+
+    Query vectors are kept L2-normalized in a fixed (capacity, dim) ring
+    buffer, so a lookup is a single matrix-vector product. Each slot also
+    stores a key (index name and search parameters); only slots with the
+    same key can match. Keys are mapped to integer ids kept in a parallel
+    array, so masking other keys is vectorized too.
+    """
+
+    def __init__(self, dim: int, capacity: int = 512, threshold: float = 0.97):
+        """Initialize the cache.
+
+        Args:
+            dim: Query vector dimensionality
+            capacity: Number of queries to remember
+            threshold: Minimum cosine similarity to count as a hit
+        """
+        self.dim = dim
+        self.capacity = capacity
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        # Key id per slot (-1 for empty slots)
+        self._slot_keys = np.full(capacity, -1, dtype=np.int64)
+        self._key_ids: dict[Hashable, int] = {}
+        self._next_key_id = 0
+        self._results: list[tuple[SearchResult, ...] | None] = [None] * capacity
+        self._next = 0
+
+    def _normalize(self, vector: list[float] | np.ndarray) -> np.ndarray | None:
+        query = np.asarray(vector, dtype=np.float32).ravel()
+        if query.shape[0] != self.dim:
+            return None
+        norm = np.linalg.norm(query)
+        return query / norm if norm else None
+
+    def get(self, key: Hashable, vector: list[float] | np.ndarray) -> list[SearchResult] | None:
+        """Return cached results for a similar query with the same key."""
+        query = self._normalize(vector)
+        key_id = self._key_ids.get(key)
+        if query is not None and key_id is not None:
+            sims = np.where(self._slot_keys == key_id, self._vectors @ query, -np.inf)
+            best = int(np.argmax(sims))
+            if sims[best] >= self.threshold:
+                self.hits += 1
+                # A fresh list, so callers cannot change the cached results
+                return list(self._results[best])
+        self.misses += 1
+        return None
+
+    def _key_id(self, key: Hashable) -> int:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            if len(self._key_ids) >= self.capacity:
+                # Forget keys whose slots have all been overwritten
+                live = set(self._slot_keys.tolist())
+                self._key_ids = {k: i for k, i in self._key_ids.items() if i in live}
+            key_id = self._key_ids[key] = self._next_key_id
+            self._next_key_id += 1
+        return key_id
+
+    def put(
+        self,
+        key: Hashable,
+        vector: list[float] | np.ndarray,
+        results: list[SearchResult],
+    ) -> None:
+        """Remember results for a query, overwriting the oldest slot when full."""
+        query = self._normalize(vector)
+        if query is None:
+            return
+        slot = self._next
+        self._vectors[slot] = query
+        self._slot_keys[slot] = self._key_id(key)
+        self._results[slot] = tuple(results)
+        self._next = (slot + 1) % self.capacity
+
+    def invalidate(self, index_name: str) -> None:
+        """Drop every cached query for an index (its contents changed)."""
+        stale = [
+            key for key in self._key_ids
+            if isinstance(key, tuple) and key and key[0] == index_name
+        ]
+        if not stale:
+            return
+        stale_ids = [self._key_ids.pop(key) for key in stale]
+        slots = np.flatnonzero(np.isin(self._slot_keys, stale_ids))
+        self._slot_keys[slots] = -1
+        for slot in slots:
+            self._results[slot] = None
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
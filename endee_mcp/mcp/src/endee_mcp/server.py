@@ -2,14 +2,16 @@
 
 import asyncio
 import logging
+import sys
 from typing import Any
 
 from mcp.server import Server
-from mcp.server.stdio import stdio_server
 
 from .config import Config
 from .client import EndeeClient
+from .context import ToolContext, bind_tool
 from .embeddings import EmbeddingManager
+from .tools import index, vector, search, batch, backup, system
 
 # Configure logging
 logging.basicConfig(
@@ -18,16 +20,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global instances
-config: Config | None = None
-endee_client: EndeeClient | None = None
-embedding_manager: EmbeddingManager | None = None
-
 
 async def main():
     """Main entry point for MCP server."""
-    global config, endee_client, embedding_manager
-    
     # Load configuration
     config = Config.from_env()
     logger.info(f"Starting Endee MCP server with transport: {config.mcp_transport}")
@@ -35,7 +30,8 @@ async def main():
     # Initialize Endee client
     endee_client = EndeeClient(
         base_url=config.endee_url,
-        auth_token=config.endee_auth_token if config.endee_auth_token else None
+        auth_token=config.endee_auth_token if config.endee_auth_token else None,
+        http2=config.endee_http2,
     )
     
     # Initialize embedding manager
@@ -45,49 +41,72 @@ async def main():
         openai_model=config.openai_embedding_model,
         local_model=config.local_embedding_model,
         preload_local=config.preload_local_model,
+        query_cache_size=config.query_cache_size,
+        embed_cache_size=config.embed_cache_size,
+        cache_dir=config.cache_dir or None,
+        openai_concurrency=config.openai_concurrency,
+        local_idle_timeout=config.local_model_idle_sec,
+        query_max_batch=config.embed_query_max_batch,
+        query_max_delay_ms=config.embed_query_max_delay_ms,
+        normalize_cache_keys=config.embed_cache_normalize,
+        local_fp16=config.local_embed_fp16,
+        local_backend=config.local_embed_backend,
     )
     
+    # Resolve the provider once; every tool reuses the cached instance
+    try:
+        embedding_manager.get_provider()
+    except ValueError as e:
+        # Tools that do not embed keep working
+        logger.warning(f"Embedding provider unavailable: {e}")
+    
     # Create MCP server
     server = Server("endee-mcp")
     
-    # Register tools
-    from .tools import index, vector, search, batch, backup, system
+    # Register tools, each bound to the shared context
+    ctx = ToolContext(
+        config=config,
+        endee_client=endee_client,
+        embedding_manager=embedding_manager,
+    )
     
     # Index management tools
-    server.tool()(index.endee_create_index)
-    server.tool()(index.endee_list_indexes)
-    server.tool()(index.endee_describe_index)
-    server.tool()(index.endee_delete_index)
+    server.tool()(bind_tool(index.endee_create_index, ctx))
+    server.tool()(bind_tool(index.endee_list_indexes, ctx))
+    server.tool()(bind_tool(index.endee_describe_index, ctx))
+    server.tool()(bind_tool(index.endee_delete_index, ctx))
     
     # Vector operation tools
-    server.tool()(vector.endee_upsert_vectors)
-    server.tool()(vector.endee_upsert_documents)
-    server.tool()(vector.endee_get_vector)
-    server.tool()(vector.endee_delete_vector)
-    server.tool()(vector.endee_delete_by_filter)
-    server.tool()(vector.endee_update_filters)
+    server.tool()(bind_tool(vector.endee_upsert_vectors, ctx))
+    server.tool()(bind_tool(vector.endee_upsert_documents, ctx))
+    server.tool()(bind_tool(vector.endee_get_vector, ctx))
+    server.tool()(bind_tool(vector.endee_delete_vector, ctx))
+    server.tool()(bind_tool(vector.endee_delete_by_filter, ctx))
+    server.tool()(bind_tool(vector.endee_update_filters, ctx))
     
     # Search tools
-    server.tool()(search.endee_search)
-    server.tool()(search.endee_search_text)
-    server.tool()(search.endee_hybrid_search)
+    server.tool()(bind_tool(search.endee_search, ctx))
+    server.tool()(bind_tool(search.endee_search_text, ctx))
+    server.tool()(bind_tool(search.endee_hybrid_search, ctx))
     
     # Batch import tools
-    server.tool()(batch.endee_import_json)
-    server.tool()(batch.endee_import_csv)
+    server.tool()(bind_tool(batch.endee_import_json, ctx))
+    server.tool()(bind_tool(batch.endee_import_csv, ctx))
     
     # Backup tools
-    server.tool()(backup.endee_create_backup)
-    server.tool()(backup.endee_list_backups)
-    server.tool()(backup.endee_restore_backup)
-    server.tool()(backup.endee_delete_backup)
+    server.tool()(bind_tool(backup.endee_create_backup, ctx))
+    server.tool()(bind_tool(backup.endee_list_backups, ctx))
+    server.tool()(bind_tool(backup.endee_restore_backup, ctx))
+    server.tool()(bind_tool(backup.endee_delete_backup, ctx))
     
     # System tools
-    server.tool()(system.endee_health_check)
-    server.tool()(system.endee_get_config)
+    server.tool()(bind_tool(system.endee_health_check, ctx))
+    server.tool()(bind_tool(system.endee_get_config, ctx))
     
     # Start server
     if config.mcp_transport == "stdio":
+        from mcp.server.stdio import stdio_server
+        
         async with stdio_server() as (read_stream, write_stream):
             await server.run(
                 read_stream,
@@ -126,5 +145,20 @@ async def main():
         await endee_client.close()
 
 
+def run():
+    """Run the MCP server, on uvloop (winloop on Windows) when installed."""
+    try:
+        if sys.platform == "win32":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+        loop_factory = fast_loop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main())
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
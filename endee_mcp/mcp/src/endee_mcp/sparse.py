@@ -0,0 +1,87 @@
+"""Endee MCP Framework - BM25 sparse vectors for hybrid search."""
+
+import functools
+import re
+import zlib
+from collections import Counter
+from typing import Mapping
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+def term_index(term: str, sparse_dim: int) -> int:
+    """Bucket of a term in a sparse space with ``sparse_dim`` dimensions.
+
+    Uses crc32 rather than ``hash()`` so indices are the same in every process.
+    """
+    return zlib.crc32(term.encode()) % sparse_dim
+
+
+class BM25Encoder:
+    """Encode text as a BM25-weighted sparse vector.
+
+    Terms are hashed into the index's sparse dimensions, so no vocabulary
+    has to be stored. Each distinct term is weighted
+    ``idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))``; terms
+    that land in the same bucket add up.
+    """
+
+    def __init__(
+        self,
+        sparse_dim: int,
+        k1: float = 1.5,
+        b: float = 0.75,
+        avgdl: float | None = None,
+        idf: Mapping[str, float] | None = None,
+    ):
+        """Initialize the encoder.
+
+        Args:
+            sparse_dim: Sparse dimensionality of the target index
+            k1: Term frequency saturation
+            b: Length normalization strength
+            avgdl: Average corpus text length in tokens (None disables length normalization)
+            idf: Inverse document frequency per term (missing terms weigh 1.0)
+        """
+        self.sparse_dim = sparse_dim
+        self.k1 = k1
+        self.b = b
+        self.avgdl = avgdl
+        self.idf = idf or {}
+
+    def encode(self, text: str) -> tuple[list[int], list[float]]:
+        """Encode text.
+
+        Args:
+            text: Query or document text
+
+        Returns:
+            Tuple of (sparse indices, sparse values)
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return [], []
+        ratio = len(tokens) / self.avgdl if self.avgdl else 1.0
+        norm = self.k1 * (1 - self.b + self.b * ratio)
+
+        weights: dict[int, float] = {}
+        for term, tf in Counter(tokens).items():
+            index = term_index(term, self.sparse_dim)
+            weight = self.idf.get(term, 1.0) * tf * (self.k1 + 1) / (tf + norm)
+            weights[index] = weights.get(index, 0.0) + weight
+        return list(weights), list(weights.values())
+
+
+@functools.lru_cache(maxsize=16)
+def bm25_encoder(sparse_dim: int) -> BM25Encoder:
+    """Encoder shared by all texts written to or searched in this sparse space.
+
+    Documents and queries have to go through the same encoder for their
+    buckets to line up.
+    """
+    return BM25Encoder(sparse_dim)
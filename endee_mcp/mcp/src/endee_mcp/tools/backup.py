@@ -2,8 +2,11 @@
 
 from typing import Any
 
+from ..context import ToolContext
+
 
 async def endee_create_backup(
+    ctx: ToolContext,
     index_name: str,
     backup_name: str,
 ) -> dict[str, Any]:
@@ -16,24 +19,21 @@ async def endee_create_backup(
     Returns:
         Success message
     """
-    from ..server import endee_client
-    
-    return await endee_client.create_backup(index_name, backup_name)
+    return await ctx.endee_client.create_backup(index_name, backup_name)
 
 
-async def endee_list_backups() -> dict[str, Any]:
+async def endee_list_backups(ctx: ToolContext) -> dict[str, Any]:
     """List all available backups.
     
     Returns:
         List of backup names
     """
-    from ..server import endee_client
-    
-    backups = await endee_client.list_backups()
+    backups = await ctx.endee_client.list_backups()
     return {"backups": backups}
 
 
 async def endee_restore_backup(
+    ctx: ToolContext,
     backup_name: str,
     target_index_name: str,
 ) -> dict[str, Any]:
@@ -46,12 +46,11 @@ async def endee_restore_backup(
     Returns:
         Success message
     """
-    from ..server import endee_client
-    
-    return await endee_client.restore_backup(backup_name, target_index_name)
+    return await ctx.endee_client.restore_backup(backup_name, target_index_name)
 
 
 async def endee_delete_backup(
+    ctx: ToolContext,
     backup_name: str,
     confirm: bool = False,
 ) -> dict[str, Any]:
@@ -70,6 +69,4 @@ async def endee_delete_backup(
     if not confirm:
         raise ValueError("Must set confirm=True to delete backup")
     
-    from ..server import endee_client
-    
-    return await endee_client.delete_backup(backup_name)
+    return await ctx.endee_client.delete_backup(backup_name)
@@ -1,112 +1,271 @@
 """Endee MCP Framework - Batch import tools."""
 
-import json
+import asyncio
 import csv
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Callable, Iterable, Iterator, Literal
 
+import numpy as np
+import orjson
 
-async def endee_import_json(
+from ..context import ToolContext
+from ..sparse import bm25_encoder
+
+
+async def _embed_unique(provider, texts: list[str], batch_size: int) -> dict[str, np.ndarray]:
+    """Embed each distinct text once.
+    
+    Texts are sorted by length before batching so each batch holds texts of
+    similar size, which keeps padding small for local models.
+    
+    Returns:
+        Mapping from text to embedding
+    """
+    unique_texts = sorted(dict.fromkeys(texts), key=len)
+    text_to_vec: dict[str, np.ndarray] = {}
+    for i in range(0, len(unique_texts), batch_size):
+        chunk = unique_texts[i:i + batch_size]
+        text_to_vec.update(zip(chunk, await provider.embed_texts(chunk)))
+    return text_to_vec
+
+
+def _batched(records: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    """Yield lists of up to ``size`` records."""
+    it = iter(records)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _iter_json_records(path: Path) -> Iterator[dict]:
+    """Yield records from a JSONL file or a JSON array without loading it whole.
+    
+    JSON arrays are parsed incrementally with ijson when it is installed
+    (``pip install endee-mcp[stream]``); otherwise the file is read at once.
+    """
+    with open(path, 'rb') as f:
+        if path.suffix == '.jsonl':
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
+            return
+        try:
+            import ijson
+        except ImportError:
+            yield from orjson.loads(f.read())
+            return
+        yield from ijson.items(f, 'item', use_float=True)
+
+
+def _parse_vector(text: str) -> list[float]:
+    """Parse a CSV vector cell: a JSON array or comma/space-separated floats.
+    
+    Bare lists are wrapped into a JSON array so both forms go through
+    orjson, which parses float text faster than numpy's text readers.
+    """
+    text = text.strip()
+    if not text.startswith("["):
+        text = "[" + ",".join(text.replace(",", " ").split()) + "]"
+    return orjson.loads(text)
+
+
+def _iter_csv_records(path: Path, delimiter: str) -> Iterator[dict]:
+    """Yield CSV rows as dicts."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f, delimiter=delimiter)
+
+
+@dataclass(slots=True)
+class _ImportBatch:
+    """Records of one batch, stored column-wise (one entry per record)."""
+    
+    ids: list[str] = field(default_factory=list)
+    vectors: list[Any] = field(default_factory=list)
+    meta: list[dict] | None = None
+    filter: list[dict] | None = None
+    # Embedded texts, kept for the sparse part of hybrid indexes
+    texts: list[str] | None = None
+
+
+async def _import_records(
+    ctx: ToolContext,
     index_name: str,
-    file_path: str,
-    id_field: str = "id",
-    text_field: str | None = None,
-    vector_field: str | None = None,
-    meta_fields: list[str] | None = None,
-    filter_fields: list[str] | None = None,
-    batch_size: int = 100,
-    embedding_provider: Literal["openai", "local", "auto"] = "auto",
+    records: Iterable[dict],
+    id_field: str,
+    text_field: str | None,
+    vector_field: str | None,
+    meta_fields: list[str] | None,
+    filter_fields: list[str] | None,
+    batch_size: int,
+    parse_vector: Callable[[Any], Any] | None = None,
+    concurrency: int = 4,
 ) -> dict[str, Any]:
-    """Import data from a JSON or JSONL file.
+    """Embed and upsert records batch by batch.
+    
+    The next batch is embedded while earlier ones are being upserted, with
+    up to ``concurrency`` upsert requests in flight, so only a few batches
+    are held in memory. Texts repeated across batches are served by the
+    provider's embedding cache. For hybrid indexes, embedded texts are also
+    written as BM25 sparse vectors, encoded the way ``endee_hybrid_search``
+    encodes queries; records imported with ``vector_field`` get no sparse
+    part (send those through ``endee_upsert_vectors`` instead).
     
     Args:
+        ctx: Shared tool context
         index_name: Target index name
-        file_path: Path to JSON/JSONL file
+        records: Iterable of records (consumed lazily)
         id_field: Field to use as ID
         text_field: Field with text to embed (if no vector_field)
         vector_field: Field with pre-computed vectors
         meta_fields: Fields for metadata
         filter_fields: Fields for filtering
         batch_size: Records per batch
-        embedding_provider: Embedding provider
+        parse_vector: Optional conversion applied to ``vector_field`` values
+        concurrency: Maximum concurrent upsert requests
     
     Returns:
         Import statistics
     """
-    from ..server import endee_client, embedding_manager
+    if not text_field and not vector_field:
+        raise ValueError("Either a text field or a vector field is required")
     
-    path = Path(file_path)
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-    
-    # Read file
-    records = []
-    with open(path, 'r', encoding='utf-8') as f:
-        if path.suffix == '.jsonl':
-            for line in f:
-                records.append(json.loads(line))
-        else:
-            records = json.load(f)
-    
-    # Process records
     total_imported = 0
     failed = 0
     
     # Get embedding provider if needed
     provider = None
-    if text_field and not vector_field:
-        provider = embedding_manager.get_provider()
-    
-    # Process in batches
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
-        vectors = []
-        
-        for record in batch:
-            try:
-                vector_item = {"id": record[id_field]}
+    if not vector_field:
+        provider = ctx.embedding_manager.get_import_provider()
+    
+    # Embedded batches waiting for upsert; the bound keeps memory in check
+    queue: asyncio.Queue[_ImportBatch | None] = asyncio.Queue(maxsize=2)
+    
+    async def produce() -> None:
+        nonlocal failed
+        for batch in _batched(records, batch_size):
+            columns = _ImportBatch(
+                meta=[] if meta_fields else None,
+                filter=[] if filter_fields else None,
+            )
+            # texts[i] is the text to embed for columns.ids[i]
+            texts: list[str] = []
+            
+            for record in batch:
+                try:
+                    record_id = record[id_field]
+                    
+                    # Get vector or text
+                    if vector_field:
+                        value = record[vector_field]
+                        vector = parse_vector(value) if parse_vector else value
+                    else:
+                        text = record[text_field]
+                    
+                    # Metadata and filter fields
+                    meta = filter_values = None
+                    if meta_fields:
+                        meta = {f: record[f] for f in meta_fields if f in record}
+                    if filter_fields:
+                        filter_values = {f: record[f] for f in filter_fields if f in record}
+                except Exception as e:
+                    failed += 1
+                    continue
                 
-                # Get vector or text
+                columns.ids.append(record_id)
                 if vector_field:
-                    vector_item["vector"] = record[vector_field]
-                elif text_field:
-                    # Will embed later
-                    pass
-                
-                # Add metadata
-                if meta_fields:
-                    vector_item["meta"] = {
-                        field: record.get(field) 
-                        for field in meta_fields 
-                        if field in record
-                    }
-                
-                # Add filter fields
-                if filter_fields:
-                    vector_item["filter"] = {
-                        field: record.get(field)
-                        for field in filter_fields
-                        if field in record
-                    }
-                
-                vectors.append(vector_item)
-            except Exception as e:
-                failed += 1
-                continue
-        
-        # Generate embeddings if needed
-        if provider and text_field:
-            texts = [record[text_field] for record in batch if text_field in record]
-            embeddings = await provider.embed_texts(texts)
-            for vec, emb in zip(vectors, embeddings):
-                vec["vector"] = emb
-        
-        # Upsert to Endee
+                    columns.vectors.append(vector)
+                else:
+                    texts.append(text)
+                if columns.meta is not None:
+                    columns.meta.append(meta)
+                if columns.filter is not None:
+                    columns.filter.append(filter_values)
+            
+            if texts:
+                # Embed every distinct text in the batch once, only for valid records
+                text_to_vec = await _embed_unique(provider, texts, batch_size)
+                columns.vectors = [text_to_vec[text] for text in texts]
+                columns.texts = texts
+            
+            if columns.ids:
+                await queue.put(columns)
+        # Only reached on success; on an error the consumer is cancelled instead
+        await queue.put(None)
+    
+    # Whether the index is hybrid, looked up while the first batch embeds
+    info = None
+    if provider is not None:
+        info = asyncio.create_task(ctx.endee_client.get_index_info(index_name))
+    
+    # Upserts in flight at once; the client reuses pooled connections
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def upsert(columns: _ImportBatch) -> None:
+        nonlocal total_imported, failed
         try:
-            await endee_client.upsert_vectors(index_name, vectors)
-            total_imported += len(vectors)
+            sparse_dim = None
+            if columns.texts is not None:
+                # Shared by every upsert, so one being cancelled must not cancel it
+                sparse_dim = (await asyncio.shield(info)).get("sparse_dim")
+            if sparse_dim:
+                # Packed columns carry no sparse part, so hybrid rows go per vector
+                encoder = bm25_encoder(sparse_dim)
+                vectors = []
+                for i, text in enumerate(columns.texts):
+                    sparse_indices, sparse_values = encoder.encode(text)
+                    vectors.append({
+                        "id": columns.ids[i],
+                        "vector": columns.vectors[i],
+                        "meta": columns.meta[i] if columns.meta is not None else None,
+                        "filter": columns.filter[i] if columns.filter is not None else None,
+                        "sparse_indices": sparse_indices,
+                        "sparse_values": sparse_values,
+                    })
+                await ctx.endee_client.upsert_vectors(index_name, vectors)
+            else:
+                await ctx.endee_client.upsert_vectors_float32(
+                    index_name, columns.ids, columns.vectors, columns.meta, columns.filter
+                )
+            total_imported += len(columns.ids)
         except Exception as e:
-            failed += len(vectors)
+            failed += len(columns.ids)
+        finally:
+            semaphore.release()
+    
+    async def consume() -> None:
+        tasks: set[asyncio.Task] = set()
+        try:
+            while (columns := await queue.get()) is not None:
+                # Wait for a free slot first so finished batches do not pile up
+                await semaphore.acquire()
+                task = asyncio.create_task(upsert(columns))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Cancelled: stop the upserts too, so none write after the tool failed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    
+    producer = asyncio.create_task(produce())
+    consumer = asyncio.create_task(consume())
+    try:
+        await asyncio.gather(producer, consumer)
+    except BaseException:
+        # Stop the sibling, and wait for it, before surfacing the error
+        producer.cancel()
+        consumer.cancel()
+        await asyncio.gather(producer, consumer, return_exceptions=True)
+        raise
+    finally:
+        # Only once every upsert is done or cancelled, so none is left
+        # waiting on a lookup cancelled under it
+        if info is not None:
+            info.cancel()
+            await asyncio.gather(info, return_exceptions=True)
     
     return {
         "success": True,
@@ -115,7 +274,54 @@ async def endee_import_json(
     }
 
 
+async def endee_import_json(
+    ctx: ToolContext,
+    index_name: str,
+    file_path: str,
+    id_field: str = "id",
+    text_field: str | None = None,
+    vector_field: str | None = None,
+    meta_fields: list[str] | None = None,
+    filter_fields: list[str] | None = None,
+    batch_size: int = 100,
+    embedding_provider: Literal["openai", "local", "auto"] = "auto",
+) -> dict[str, Any]:
+    """Import data from a JSON or JSONL file.
+    
+    Args:
+        index_name: Target index name
+        file_path: Path to JSON/JSONL file
+        id_field: Field to use as ID
+        text_field: Field with text to embed (if no vector_field)
+        vector_field: Field with pre-computed vectors
+        meta_fields: Fields for metadata
+        filter_fields: Fields for filtering
+        batch_size: Records per batch
+        embedding_provider: Embedding provider
+    
+    Returns:
+        Import statistics
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    return await _import_records(
+        ctx,
+        index_name,
+        _iter_json_records(path),
+        id_field=id_field,
+        text_field=text_field,
+        vector_field=vector_field,
+        meta_fields=meta_fields,
+        filter_fields=filter_fields,
+        batch_size=batch_size,
+        concurrency=ctx.config.import_concurrency,
+    )
+
+
 async def endee_import_csv(
+    ctx: ToolContext,
     index_name: str,
     file_path: str,
     id_column: str = "id",
@@ -144,81 +350,20 @@ async def endee_import_csv(
     Returns:
         Import statistics
     """
-    from ..server import endee_client, embedding_manager
-    
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    # Read CSV
-    records = []
-    with open(path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
-        records = list(reader)
-    
-    # Process records
-    total_imported = 0
-    failed = 0
-    
-    # Get embedding provider if needed
-    provider = None
-    if text_column and not vector_column:
-        provider = embedding_manager.get_provider()
-    
-    # Process in batches
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
-        vectors = []
-        
-        for record in batch:
-            try:
-                vector_item = {"id": record[id_column]}
-                
-                # Get vector or text
-                if vector_column:
-                    # Parse JSON vector
-                    vector_item["vector"] = json.loads(record[vector_column])
-                elif text_column:
-                    # Will embed later
-                    pass
-                
-                # Add metadata
-                if meta_columns:
-                    vector_item["meta"] = {
-                        col: record.get(col)
-                        for col in meta_columns
-                        if col in record
-                    }
-                
-                # Add filter fields
-                if filter_columns:
-                    vector_item["filter"] = {
-                        col: record.get(col)
-                        for col in filter_columns
-                        if col in record
-                    }
-                
-                vectors.append(vector_item)
-            except Exception as e:
-                failed += 1
-                continue
-        
-        # Generate embeddings if needed
-        if provider and text_column:
-            texts = [record[text_column] for record in batch if text_column in record]
-            embeddings = await provider.embed_texts(texts)
-            for vec, emb in zip(vectors, embeddings):
-                vec["vector"] = emb
-        
-        # Upsert to Endee
-        try:
-            await endee_client.upsert_vectors(index_name, vectors)
-            total_imported += len(vectors)
-        except Exception as e:
-            failed += len(vectors)
-    
-    return {
-        "success": True,
-        "total_imported": total_imported,
-        "failed": failed,
-    }
+    return await _import_records(
+        ctx,
+        index_name,
+        _iter_csv_records(path, delimiter),
+        id_field=id_column,
+        text_field=text_column,
+        vector_field=vector_column,
+        meta_fields=meta_columns,
+        filter_fields=filter_columns,
+        batch_size=batch_size,
+        parse_vector=_parse_vector,
+        concurrency=ctx.config.import_concurrency,
+    )
@@ -2,12 +2,12 @@
 
 from typing import Any, Literal
 
-from mcp.server import Server
-
+from ..context import ToolContext
 from ..types import IndexConfig
 
 
 async def endee_create_index(
+    ctx: ToolContext,
     name: str,
     dimension: int,
     space_type: Literal["cosine", "l2", "ip"] = "cosine",
@@ -30,8 +30,6 @@ async def endee_create_index(
     Returns:
         Success message
     """
-    from ..server import endee_client
-    
     config = IndexConfig(
         name=name,
         dimension=dimension,
@@ -42,22 +40,20 @@ async def endee_create_index(
         ef_construction=ef_construction,
     )
     
-    return await endee_client.create_index(config)
+    return await ctx.endee_client.create_index(config)
 
 
-async def endee_list_indexes() -> dict[str, Any]:
+async def endee_list_indexes(ctx: ToolContext) -> dict[str, Any]:
     """List all available indexes.
     
     Returns:
         List of index information
     """
-    from ..server import endee_client
-    
-    indexes = await endee_client.list_indexes()
+    indexes = await ctx.endee_client.list_indexes()
     return {"indexes": [idx.model_dump() for idx in indexes]}
 
 
-async def endee_describe_index(name: str) -> dict[str, Any]:
+async def endee_describe_index(ctx: ToolContext, name: str) -> dict[str, Any]:
     """Get detailed information about an index.
     
     Args:
@@ -66,12 +62,10 @@ async def endee_describe_index(name: str) -> dict[str, Any]:
     Returns:
         Index details
     """
-    from ..server import endee_client
-    
-    return await endee_client.get_index_info(name)
+    return await ctx.endee_client.get_index_info(name)
 
 
-async def endee_delete_index(name: str, confirm: bool = False) -> dict[str, Any]:
+async def endee_delete_index(ctx: ToolContext, name: str, confirm: bool = False) -> dict[str, Any]:
     """Delete an index and all its data.
     
     Args:
@@ -87,6 +81,4 @@ async def endee_delete_index(name: str, confirm: bool = False) -> dict[str, Any]
     if not confirm:
         raise ValueError("Must set confirm=True to delete index")
     
-    from ..server import endee_client
-    
-    return await endee_client.delete_index(name)
+    return await ctx.endee_client.delete_index(name)
@@ -1,15 +1,57 @@
 """Endee MCP Framework - Search tools."""
 
+import base64
 from typing import Any, Literal
 
+import numpy as np
+
+from ..context import ToolContext
+from ..sparse import bm25_encoder
+from ..types import SearchResult, SearchResultListAdapter
+
+
+# Vectors with components beyond this would overflow to inf as float16
+_FLOAT16_MAX = float(np.finfo(np.float16).max)
+
+
+def _dump_results(
+    results: list[SearchResult],
+    include_vectors: bool = False,
+    decode_vectors: bool = False,
+) -> list[dict[str, Any]]:
+    """Convert search results to dicts.
+    
+    Vectors are left out unless ``include_vectors`` is set. They are then
+    sent as ``vector_f16`` (base64 of little-endian float16 bytes, under
+    3 characters per element against ~20 for a JSON float), or as
+    ``vector`` lists with ``decode_vectors``. A vector with a component
+    float16 cannot represent is sent as ``vector_f32`` (float32 bytes).
+    """
+    if include_vectors and decode_vectors:
+        return SearchResultListAdapter.dump_python(results)
+    dumped = SearchResultListAdapter.dump_python(results, exclude={"__all__": {"vector"}})
+    if include_vectors:
+        for item, result in zip(dumped, results):
+            if result.vector is not None:
+                vector = np.asarray(result.vector, dtype="<f4")
+                if vector.size and np.abs(vector).max() > _FLOAT16_MAX:
+                    item["vector_f32"] = base64.b64encode(vector.tobytes()).decode("ascii")
+                else:
+                    item["vector_f16"] = base64.b64encode(
+                        vector.astype("<f2").tobytes()
+                    ).decode("ascii")
+    return dumped
+
 
 async def endee_search(
+    ctx: ToolContext,
     index_name: str,
     vector: list[float],
     top_k: int = 10,
     filter: list[dict[str, Any]] | None = None,
     ef: int = 128,
     include_vectors: bool = False,
+    decode_vectors: bool = False,
 ) -> dict[str, Any]:
     """Search for similar vectors using a query vector.
     
@@ -20,15 +62,17 @@ async def endee_search(
         filter: Optional filter conditions
         ef: Search quality parameter
         include_vectors: Include vector data
+        decode_vectors: Return included vectors as float lists instead of
+            base64 float16 (``vector_f16``, about 3 significant digits) or,
+            for components beyond float16 range, base64 float32 (``vector_f32``)
     
     Returns:
         Search results
     """
-    from ..server import endee_client
-    
-    results = await endee_client.search(
+    results = await ctx.endee_client.search(
         index_name=index_name,
-        vector=vector,
+        # One packed float32 buffer from here on instead of boxed floats
+        vector=np.asarray(vector, dtype=np.float32),
         top_k=top_k,
         filter_conditions=filter,
         ef=ef,
@@ -36,12 +80,13 @@ async def endee_search(
     )
     
     return {
-        "results": [r.model_dump() for r in results],
+        "results": _dump_results(results, include_vectors, decode_vectors),
         "total_results": len(results),
     }
 
 
 async def endee_search_text(
+    ctx: ToolContext,
     index_name: str,
     query: str,
     top_k: int = 10,
@@ -64,16 +109,14 @@ async def endee_search_text(
     Returns:
         Search results with provider info
     """
-    from ..server import endee_client, embedding_manager, config
-    
     # Get embedding provider
-    provider = embedding_manager.get_provider()
+    provider = ctx.embedding_manager.get_provider()
     
-    # Generate query embedding
-    query_vector = await provider.embed_query(query)
+    # Generate query embedding (repeated queries hit the cache)
+    query_vector = await ctx.embedding_manager.embed_query_cached(query)
     
     # Search
-    results = await endee_client.search(
+    results = await ctx.endee_client.search(
         index_name=index_name,
         vector=query_vector,
         top_k=top_k,
@@ -83,13 +126,14 @@ async def endee_search_text(
     )
     
     return {
-        "results": [r.model_dump() for r in results],
+        "results": _dump_results(results),
         "total_results": len(results),
         "query_embedding_provider": provider.provider_name,
     }
 
 
 async def endee_hybrid_search(
+    ctx: ToolContext,
     index_name: str,
     query: str,
     top_k: int = 10,
@@ -110,22 +154,18 @@ async def endee_hybrid_search(
     Returns:
         Hybrid search results
     """
-    from ..server import endee_client, embedding_manager
-    
-    # Get embedding provider
-    provider = embedding_manager.get_provider()
-    
-    # Generate dense embedding
-    dense_vector = await provider.embed_query(query)
+    # Generate dense embedding (repeated queries hit the cache)
+    dense_vector = await ctx.embedding_manager.embed_query_cached(query)
     
-    # Generate sparse representation (simple tokenization)
-    # In a real implementation, you'd use BM25 or similar
-    tokens = query.lower().split()
-    sparse_indices = list(range(len(tokens)))
-    sparse_values = [1.0] * len(tokens)
+    # Generate BM25 sparse representation in the index's sparse space, as the
+    # document tools do for the texts they write
+    info = await ctx.endee_client.get_index_info(index_name)
+    sparse_indices = sparse_values = None
+    if info.get("sparse_dim"):
+        sparse_indices, sparse_values = bm25_encoder(info["sparse_dim"]).encode(query)
     
     # Search with both vectors
-    results = await endee_client.search(
+    results = await ctx.endee_client.search(
         index_name=index_name,
         vector=dense_vector,
         sparse_indices=sparse_indices,
@@ -135,7 +175,7 @@ async def endee_hybrid_search(
     )
     
     return {
-        "results": [r.model_dump() for r in results],
+        "results": _dump_results(results),
         "total_results": len(results),
         "search_type": "hybrid",
         "dense_weight": dense_weight,
@@ -1,11 +1,20 @@
 """Endee MCP Framework - Vector operation tools."""
 
+import asyncio
 from typing import Any, Literal
 
+import numpy as np
+
+from ..context import ToolContext
+from ..sparse import bm25_encoder
 from ..types import VectorItem, DocumentItem
 
+# Vectors per upsert request in endee_upsert_documents
+_UPSERT_BATCH_SIZE = 500
+
 
 async def endee_upsert_vectors(
+    ctx: ToolContext,
     index_name: str,
     vectors: list[dict[str, Any]],
 ) -> dict[str, Any]:
@@ -18,12 +27,11 @@ async def endee_upsert_vectors(
     Returns:
         Upserted count
     """
-    from ..server import endee_client
-    
-    return await endee_client.upsert_vectors(index_name, vectors)
+    return await ctx.endee_client.upsert_vectors(index_name, vectors)
 
 
 async def endee_upsert_documents(
+    ctx: ToolContext,
     index_name: str,
     documents: list[dict[str, Any]],
     embedding_provider: Literal["openai", "local", "auto"] = "auto",
@@ -31,6 +39,10 @@ async def endee_upsert_documents(
 ) -> dict[str, Any]:
     """Insert documents with automatic embedding generation.
     
+    For hybrid indexes (with a sparse dimension), each text is also written
+    as a BM25 sparse vector, encoded the way ``endee_hybrid_search`` encodes
+    queries.
+    
     Args:
         index_name: Target index name
         documents: List of documents with id, text, meta, filter
@@ -40,41 +52,87 @@ async def endee_upsert_documents(
     Returns:
         Upserted count and provider info
     """
-    from ..server import endee_client, embedding_manager, config
-    
-    # Get embedding provider
-    provider = embedding_manager.get_provider()
+    # Get embedding provider; re-sent documents hit the disk cache if configured
+    provider = ctx.embedding_manager.get_import_provider()
     
     # Extract texts
     texts = [doc["text"] for doc in documents]
-    
-    # Generate embeddings
-    embeddings = await provider.embed_texts(texts)
-    
-    # Create vector items
-    vectors = []
-    for doc, embedding in zip(documents, embeddings):
-        vector_item = {
-            "id": doc["id"],
-            "vector": embedding,
-        }
-        if "meta" in doc:
-            vector_item["meta"] = doc["meta"]
-        if "filter" in doc:
-            vector_item["filter"] = doc["filter"]
-        vectors.append(vector_item)
-    
-    # Upsert to Endee
-    result = await endee_client.upsert_vectors(index_name, vectors)
+    size = ctx.config.embed_batch_size
+    
+    # Embedded upsert batches waiting to be sent; the bound keeps memory in check
+    queue: asyncio.Queue[tuple[int, np.ndarray] | Exception | None] = asyncio.Queue(maxsize=2)
+    
+    async def produce() -> None:
+        try:
+            for start in range(0, len(texts), _UPSERT_BATCH_SIZE):
+                batch = texts[start:start + _UPSERT_BATCH_SIZE]
+                # Embed each distinct text once; rows are fanned back out below
+                position: dict[str, int] = {}
+                inverse = [position.setdefault(text, len(position)) for text in batch]
+                unique = list(position)
+                # Chunks the provider accepts, embedded at once; gather keeps their order
+                parts = await asyncio.gather(*(
+                    provider.embed_texts(unique[i:i + size]) for i in range(0, len(unique), size)
+                ))
+                await queue.put((start, np.concatenate(parts)[inverse]))
+        except Exception as e:
+            # Hand the failure to the consumer so it stops waiting
+            await queue.put(e)
+            return
+        await queue.put(None)
+    
+    # Embed the next batch while the previous one is upserted
+    producer = asyncio.create_task(produce())
+    success = True
+    try:
+        # Looked up while the first batch embeds; int8d cosine indexes store
+        # int8 anyway, so send them one byte per element
+        info = await ctx.endee_client.get_index_info(index_name)
+        encoder = bm25_encoder(info["sparse_dim"]) if info.get("sparse_dim") else None
+        upsert = ctx.endee_client.upsert_vectors_float32
+        if info.get("precision") == "int8d" and info.get("space_type") == "cosine":
+            upsert = ctx.endee_client.upsert_vectors_int8
+        
+        while (item := await queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            start, embeddings = item
+            batch = documents[start:start + len(embeddings)]
+            if encoder is not None:
+                # Packed columns carry no sparse part, so hybrid rows go per vector
+                vectors = []
+                for doc, embedding in zip(batch, embeddings):
+                    sparse_indices, sparse_values = encoder.encode(doc["text"])
+                    vectors.append({
+                        "id": doc["id"],
+                        "vector": embedding,
+                        "meta": doc.get("meta"),
+                        "filter": doc.get("filter"),
+                        "sparse_indices": sparse_indices,
+                        "sparse_values": sparse_values,
+                    })
+                result = await ctx.endee_client.upsert_vectors(index_name, vectors)
+            else:
+                result = await upsert(
+                    index_name,
+                    [doc["id"] for doc in batch],
+                    embeddings,
+                    [doc.get("meta") for doc in batch],
+                    [doc.get("filter") for doc in batch],
+                )
+            success = success and result["success"]
+    finally:
+        producer.cancel()
     
     return {
-        **result,
+        "success": success,
         "embedding_provider": provider.provider_name,
-        "embedding_model": embedding_model or config.openai_embedding_model if provider.provider_name.startswith("openai") else config.local_embedding_model,
+        "embedding_model": embedding_model or provider.active_model,
     }
 
 
 async def endee_get_vector(
+    ctx: ToolContext,
     index_name: str,
     vector_id: str,
     include_vector: bool = False,
@@ -89,12 +147,14 @@ async def endee_get_vector(
     Returns:
         Vector info or None if not found
     """
-    from ..server import endee_client
-    
-    return await endee_client.get_vector(index_name, vector_id)
+    result = await ctx.endee_client.get_vector(index_name, vector_id)
+    if result is not None and not include_vector:
+        result.pop("vector", None)
+    return result
 
 
 async def endee_delete_vector(
+    ctx: ToolContext,
     index_name: str,
     vector_id: str,
 ) -> dict[str, Any]:
@@ -107,12 +167,11 @@ async def endee_delete_vector(
     Returns:
         Success message
     """
-    from ..server import endee_client
-    
-    return await endee_client.delete_vector(index_name, vector_id)
+    return await ctx.endee_client.delete_vector(index_name, vector_id)
 
 
 async def endee_delete_by_filter(
+    ctx: ToolContext,
     index_name: str,
     filter: list[dict[str, Any]],
 ) -> dict[str, Any]:
@@ -125,12 +184,11 @@ async def endee_delete_by_filter(
     Returns:
         Deleted count
     """
-    from ..server import endee_client
-    
-    return await endee_client.delete_by_filter(index_name, filter)
+    return await ctx.endee_client.delete_by_filter(index_name, filter)
 
 
 async def endee_update_filters(
+    ctx: ToolContext,
     index_name: str,
     updates: list[dict[str, Any]],
 ) -> dict[str, Any]:
@@ -144,6 +202,4 @@ async def endee_update_filters(
     Returns:
         Updated count
     """
-    from ..server import endee_client
-    
-    return await endee_client.update_filters(index_name, updates)
+    return await ctx.endee_client.update_filters(index_name, updates)
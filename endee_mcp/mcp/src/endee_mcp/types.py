@@ -1,11 +1,14 @@
 """Endee MCP Framework - Pydantic models."""
 
 from typing import Any, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class IndexConfig(BaseModel):
     """Configuration for creating an index."""
+    # Frozen: the client hands the same cached listing to every caller
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(..., description="Unique name for the index")
     dimension: int = Field(..., ge=2, le=16384, description="Vector dimensionality")
     space_type: Literal["cosine", "l2", "ip"] = Field(default="cosine", description="Distance metric")
@@ -65,12 +68,50 @@ class SearchQuery(BaseModel):
 
 class SearchResult(BaseModel):
     """A single search result."""
+    # Frozen: the semantic cache returns the same instances to every caller
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     similarity: float
     distance: float
     meta: dict[str, Any] | None = None
     filter: dict[str, Any] | None = None
     vector: list[float] | None = None
+    
+    @classmethod
+    def from_packed(
+        cls,
+        id: str,
+        similarity: float,
+        meta: dict[str, Any] | None = None,
+        filter: dict[str, Any] | None = None,
+        vector: list[float] | None = None,
+    ) -> "SearchResult":
+        """Build a result from already-decoded server fields without validation.
+        
+        Only for trusted server responses: fills the instance state directly,
+        which is about twice as fast as the validating constructor.
+        """
+        obj = cls.__new__(cls)
+        object.__setattr__(obj, "__dict__", {
+            "id": id,
+            "similarity": similarity,
+            "distance": 1.0 - similarity,
+            "meta": meta,
+            "filter": filter,
+            "vector": vector,
+        })
+        object.__setattr__(obj, "__pydantic_fields_set__", _SEARCH_RESULT_FIELDS)
+        object.__setattr__(obj, "__pydantic_extra__", None)
+        object.__setattr__(obj, "__pydantic_private__", None)
+        return obj
+
+
+_SEARCH_RESULT_FIELDS = frozenset(SearchResult.model_fields)
+
+# Built once; each validates or dumps a whole list in one pydantic-core call
+IndexConfigListAdapter = TypeAdapter(list[IndexConfig])
+SearchResultListAdapter = TypeAdapter(list[SearchResult])
 
 
 class BackupInfo(BaseModel):
@@ -87,3 +128,4 @@ class HealthStatus(BaseModel):
     timestamp: int
     embedding_provider: str
     local_model_loaded: bool = False
+    local_model_warmed: bool = False
@@ -1,7 +1,13 @@
 """Endee MCP Framework - Test suite."""
 
 import asyncio
+import base64
 import os
+from dataclasses import FrozenInstanceError, replace
+import zlib
+import msgpack
+import numpy as np
+import orjson
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock
@@ -23,10 +29,26 @@ from endee_mcp.types import (
     HealthStatus,
 )
 from endee_mcp.client import EndeeClient, EndeeError
+from endee_mcp.quantize import normalize_rows, quantize_int8
+from endee_mcp.semantic_cache import SemanticQueryCache
+from endee_mcp.sparse import BM25Encoder, term_index
+from endee_mcp.context import ToolContext, bind_tool
 from endee_mcp.embeddings.base import EmbeddingProvider, NoneProvider
 from endee_mcp.embeddings.openai import OpenAIEmbeddingProvider
 from endee_mcp.embeddings.local import LocalEmbeddingProvider
 from endee_mcp.embeddings import EmbeddingManager
+from endee_mcp.embeddings.batcher import QueryBatcher
+from endee_mcp.embeddings.cache import CachedEmbedder, DiskEmbeddingCache, LRUCache, text_key
+from endee_mcp.tools.batch import (
+    _batched,
+    _embed_unique,
+    _import_records,
+    _iter_json_records,
+    _parse_vector,
+    endee_import_csv,
+)
+from endee_mcp.tools import search as search_tools
+from endee_mcp.tools import vector as vector_tools
 
 
 # ============================================================================
@@ -36,6 +58,13 @@ from endee_mcp.embeddings import EmbeddingManager
 class TestConfig:
     """Test configuration management."""
     
+    @pytest.fixture(autouse=True)
+    def fresh_env_config(self):
+        """Re-read the environment in every test."""
+        Config.from_env.cache_clear()
+        yield
+        Config.from_env.cache_clear()
+    
     def test_default_config(self):
         """Test default configuration values."""
         config = Config()
@@ -71,12 +100,23 @@ class TestConfig:
         assert config.mcp_sse_port == 5000
         assert config.preload_local_model is True
     
+    def test_from_env_is_cached(self, monkeypatch):
+        """Test the environment is parsed once until the cache is cleared."""
+        monkeypatch.setenv("LOCAL_EMBED_FP16", "Yes")
+        config = Config.from_env()
+        monkeypatch.setenv("ENDEE_URL", "http://other:8080")
+        assert Config.from_env() is config
+        assert config.local_embed_fp16 is True
+        
+        Config.from_env.cache_clear()
+        assert Config.from_env().endee_url == "http://other:8080"
+    
     def test_is_openai_configured(self):
         """Test OpenAI configuration check."""
         config = Config()
         assert config.is_openai_configured() is False
         
-        config.openai_api_key = "sk-test"
+        config = replace(config, openai_api_key="sk-test")
         assert config.is_openai_configured() is True
     
     def test_is_auth_enabled(self):
@@ -84,9 +124,17 @@ class TestConfig:
         config = Config()
         assert config.is_auth_enabled() is False
         
-        config.endee_auth_token = "test-token"
+        config = replace(config, endee_auth_token="test-token")
         assert config.is_auth_enabled() is True
     
+    def test_config_is_frozen(self):
+        """Test config cannot be mutated and to_dict reflects derived values."""
+        config = Config(openai_api_key="sk-test")
+        with pytest.raises(FrozenInstanceError):
+            config.endee_url = "http://other:8080"
+        assert config.to_dict()["embedding_provider_actual"] == "openai"
+        assert replace(config, openai_api_key="").get_embedding_provider() == "local"
+    
     def test_get_embedding_provider_auto_with_openai(self):
         """Test auto provider selection with OpenAI key."""
         config = Config(embedding_provider="auto", openai_api_key="sk-test")
@@ -172,12 +220,122 @@ class TestSearchResult:
         assert result.similarity == 0.95
         assert result.distance == 0.05
         assert result.meta == {"title": "Test Doc"}
+    
+    def test_from_packed_matches_validated(self):
+        """Test the unvalidated fast path builds an equivalent model."""
+        packed = SearchResult.from_packed("doc1", 0.75, {"title": "Test Doc"})
+        validated = SearchResult(
+            id="doc1", similarity=0.75, distance=0.25, meta={"title": "Test Doc"}
+        )
+        assert packed == validated
+        assert packed.model_dump() == validated.model_dump()
+    
+    def test_from_packed_sets_every_field(self):
+        """Test the fast path stays in sync with the model's fields."""
+        packed = SearchResult.from_packed("doc1", 0.75)
+        assert set(vars(packed)) == set(SearchResult.model_fields)
+        assert packed.model_fields_set == set(SearchResult.model_fields)
+    
+    def test_results_are_frozen(self):
+        """Test results shared through the caches cannot be modified."""
+        from pydantic import ValidationError
+        
+        result = SearchResult.from_packed("doc1", 0.75)
+        with pytest.raises(ValidationError):
+            result.similarity = 0.1
+    
+    @pytest.mark.asyncio
+    async def test_search_dumps_vectors_only_when_requested(self):
+        """Test search responses leave out vectors unless include_vectors is set."""
+        result = SearchResult(id="doc1", similarity=0.9, distance=0.1, vector=[0.5, 0.25])
+        ctx = Mock(endee_client=Mock(search=AsyncMock(return_value=[result])))
+        
+        without = await search_tools.endee_search(ctx, "idx", [0.5, 0.25])
+        compact = await search_tools.endee_search(ctx, "idx", [0.5, 0.25], include_vectors=True)
+        decoded = await search_tools.endee_search(
+            ctx, "idx", [0.5, 0.25], include_vectors=True, decode_vectors=True
+        )
+        
+        base = {"id": "doc1", "similarity": 0.9, "distance": 0.1, "meta": None, "filter": None}
+        assert without["results"] == [base]
+        (item,) = compact["results"]
+        assert "vector" not in item
+        assert np.frombuffer(base64.b64decode(item.pop("vector_f16")), dtype="<f2").tolist() == [0.5, 0.25]
+        assert item == base
+        assert decoded["results"] == [result.model_dump()]
+    
+    def test_dump_results_keeps_large_vectors_as_float32(self):
+        """Test vectors beyond float16 range fall back to float32 instead of inf."""
+        large = SearchResult(id="doc1", similarity=0.9, distance=0.1, vector=[1e6, 0.5])
+        
+        (item,) = search_tools._dump_results([large], include_vectors=True)
+        
+        assert "vector_f16" not in item
+        assert np.frombuffer(base64.b64decode(item["vector_f32"]), dtype="<f4").tolist() == [1e6, 0.5]
+
+
+class TestQuantize:
+    """Test client-side quantization helpers."""
+    
+    def test_normalize_rows(self):
+        """Test rows are scaled to unit length and zero rows are kept."""
+        unit, norms = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+        assert np.allclose(unit, [[0.6, 0.8], [0.0, 0.0]])
+        assert np.allclose(norms, [5.0, 0.0])
+    
+    def test_quantize_int8_roundtrip(self):
+        """Test int8 codes reconstruct the input within one step."""
+        vectors = np.random.default_rng(0).standard_normal((4, 32)).astype(np.float32)
+        codes, scales = quantize_int8(vectors)
+        assert codes.dtype == np.int8
+        assert np.abs(codes).max() == 127
+        restored = codes * scales[:, None]
+        assert np.all(np.abs(restored - vectors) <= scales[:, None])
 
 
 # ============================================================================
 # Embedding Provider Tests
 # ============================================================================
 
+class TestBM25Encoder:
+    """Test BM25 sparse encoding."""
+    
+    def test_encode_weights_repeated_terms(self):
+        """Test terms map to stable buckets with saturating tf weights."""
+        indices, values = BM25Encoder(1000).encode("Fast search, fast!")
+        
+        assert indices == [term_index("fast", 1000), term_index("search", 1000)]
+        assert values[0] == pytest.approx(2 * 2.5 / (2 + 1.5))
+        assert values[1] == pytest.approx(1.0)
+    
+    def test_encode_applies_idf_and_length(self):
+        """Test idf scales terms and texts longer than average weigh less."""
+        encoder = BM25Encoder(1000, avgdl=1.0, idf={"rare": 3.0})
+        
+        _, (rare,) = encoder.encode("rare")
+        _, values = encoder.encode("common words here")
+        
+        assert rare == pytest.approx(3.0)
+        assert all(v < 1.0 for v in values)
+        assert BM25Encoder(1000).encode("...") == ([], [])
+    
+    @pytest.mark.asyncio
+    async def test_hybrid_search_sends_bm25_vector(self):
+        """Test hybrid search encodes the query into the index's sparse space."""
+        ctx = Mock(
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={"sparse_dim": 64}),
+                search=AsyncMock(return_value=[]),
+            ),
+            embedding_manager=Mock(embed_query_cached=AsyncMock(return_value=np.ones(2))),
+        )
+        
+        await search_tools.endee_hybrid_search(ctx, "idx", "vector search")
+        
+        kwargs = ctx.endee_client.search.call_args.kwargs
+        assert (kwargs["sparse_indices"], kwargs["sparse_values"]) == BM25Encoder(64).encode("vector search")
+
+
 class TestNoneProvider:
     """Test NoneProvider (disabled embeddings)."""
     
@@ -211,6 +369,7 @@ class TestOpenAIEmbeddingProvider:
         assert provider.provider_name == "openai-text-embedding-3-small"
         assert provider.dimension == 1536
         assert provider.model == "text-embedding-3-small"
+        assert provider.active_model == "text-embedding-3-small"
     
     def test_dimensions(self):
         """Test dimensions for different models."""
@@ -228,6 +387,72 @@ class TestOpenAIEmbeddingProvider:
         provider = OpenAIEmbeddingProvider(api_key="test")
         tokens = provider.estimate_tokens(["hello world", "test"])
         assert tokens > 0  # Rough estimate: ~3 tokens
+    
+    def test_request_spans_respect_token_limit(self):
+        """Test requests are cut at the text and token limits, whichever comes first."""
+        provider = OpenAIEmbeddingProvider(api_key="test")
+        provider.MAX_BATCH_TEXTS = 3
+        provider.MAX_BATCH_TOKENS = 100
+        
+        assert provider._request_spans([10] * 7) == [(0, 3), (3, 6), (6, 7)]
+        assert provider._request_spans([60, 30, 20, 150, 5]) == [(0, 2), (2, 3), (3, 4), (4, 5)]
+    
+    @pytest.mark.asyncio
+    async def test_embed_texts_only_sends_cache_misses(self):
+        """Test cached texts are not sent to the API again."""
+        provider = OpenAIEmbeddingProvider(api_key="test-key")
+        
+        async def create(model, input):
+            return Mock(data=[Mock(embedding=[float(len(t))]) for t in input])
+        
+        client = Mock()
+        client.embeddings.create = AsyncMock(side_effect=create)
+        with patch.object(provider, '_get_client', return_value=client):
+            await provider.embed_texts(["a", "bb"])
+            result = await provider.embed_texts(["bb", "ccc", "a"])
+        
+        assert result.tolist() == [[2.0], [3.0], [1.0]]
+        assert client.embeddings.create.call_args.kwargs["input"] == ["ccc"]
+    
+    @pytest.mark.asyncio
+    async def test_embed_texts_retries_rate_limited_batches(self):
+        """Test batches run concurrently, keep their order and retry rate limits."""
+        class RateLimited(Exception):
+            pass
+        
+        provider = OpenAIEmbeddingProvider(api_key="test-key", concurrency=2)
+        provider._retryable = (RateLimited,)
+        attempts = []
+        
+        async def create(model, input):
+            attempts.append(input[0])
+            if attempts.count(input[0]) == 1 and input[0] == "t0":
+                raise RateLimited("slow down")
+            return Mock(data=[Mock(embedding=[float(t[1:])]) for t in input])
+        
+        client = Mock()
+        client.embeddings.create = AsyncMock(side_effect=create)
+        texts = [f"t{i}" for i in range(4100)]
+        with patch.object(provider, '_get_client', return_value=client), \
+                patch("asyncio.sleep", new=AsyncMock()):
+            result = await provider.embed_texts(texts)
+        
+        assert result[:, 0].tolist() == [float(i) for i in range(4100)]
+        assert attempts.count("t0") == 2
+        assert client.embeddings.create.call_count == 4
+    
+    def test_client_keeps_connections_alive(self):
+        """Test the OpenAI client gets a keep-alive pool sized for the concurrency limit."""
+        fake_openai = Mock(AsyncOpenAI=Mock(), RateLimitError=type("RateLimitError", (Exception,), {}))
+        provider = OpenAIEmbeddingProvider(api_key="sk-test", concurrency=3)
+        
+        with patch.dict(sys.modules, {"openai": fake_openai}):
+            provider._get_client()
+        
+        http_client = fake_openai.AsyncOpenAI.call_args.kwargs["http_client"]
+        pool = http_client._transport._pool
+        assert pool._max_keepalive_connections == 3
+        assert pool._keepalive_expiry == 60.0
 
 
 class TestLocalEmbeddingProvider:
@@ -238,6 +463,7 @@ class TestLocalEmbeddingProvider:
         provider = LocalEmbeddingProvider(model_name="sentence-transformers/all-MiniLM-L6-v2")
         assert provider.provider_name == "local-all-MiniLM-L6-v2"
         assert provider.dimension == 384
+        assert provider.active_model == "sentence-transformers/all-MiniLM-L6-v2"
         assert not provider.is_loaded()
     
     def test_dimensions(self):
@@ -247,6 +473,508 @@ class TestLocalEmbeddingProvider:
         
         mpnet = LocalEmbeddingProvider(model_name="sentence-transformers/all-mpnet-base-v2")
         assert mpnet.dimension == 768
+    
+    @pytest.mark.asyncio
+    async def test_model_is_unloaded_when_idle(self):
+        """Test the model is dropped after idle_timeout and the timer is re-armed on use."""
+        provider = LocalEmbeddingProvider(idle_timeout=0.05, cache_size=0)
+        provider._model = Mock()
+        provider._model.encode = Mock(side_effect=lambda texts, **kw: np.ones((len(texts), 384)))
+        
+        await provider.embed_texts(["hello"])
+        await asyncio.sleep(0.03)
+        await provider.embed_texts(["again"])
+        await asyncio.sleep(0.03)
+        assert provider.is_loaded()
+        
+        await asyncio.sleep(0.05)
+        assert not provider.is_loaded()
+    
+    @pytest.mark.asyncio
+    async def test_load_runs_warmup_batch(self):
+        """Test load() runs one uncached batch and marks the model warmed."""
+        provider = LocalEmbeddingProvider(idle_timeout=0)
+        provider._model = Mock()
+        provider._model.encode = Mock(side_effect=lambda texts, **kw: np.ones((len(texts), 384)))
+        
+        await provider.load()
+        
+        assert provider.warmed
+        provider._model.encode.assert_called_once()
+        assert len(provider.cache) == 0
+    
+    @pytest.mark.asyncio
+    async def test_fastembed_backend(self):
+        """Test the ONNX backend returns normalized float32 rows under its own name."""
+        provider = LocalEmbeddingProvider(model_name="BAAI/bge-small-en-v1.5", backend="fastembed")
+        provider._model = Mock()
+        provider._model.embed = Mock(side_effect=lambda texts, batch_size: (np.array([3.0, 4.0]) for _ in texts))
+        
+        result = await provider.embed_texts(["a", "b"])
+        
+        assert provider.provider_name == "local-bge-small-en-v1.5-onnx"
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, [[0.6, 0.8], [0.6, 0.8]], rtol=1e-6)
+
+
+class TestLRUCache:
+    """Test the LRU embedding cache."""
+    
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        assert cache.get("a") == [1.0]
+        cache.put("c", [3.0])
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert len(cache) == 2
+    
+    def test_hit_rate(self):
+        """Test hit rate statistics."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", [1.0])
+        cache.get("a")
+        cache.get("missing")
+        assert cache.hit_rate == 0.5
+
+
+class TestTextKey:
+    """Test embedding cache keys."""
+    
+    def test_normalized_keys_fold_formatting(self):
+        """Test normalized keys ignore case, whitespace and trailing punctuation."""
+        assert text_key("m", "  Hello   World. ", normalize=True) == text_key("m", "hello world", normalize=True)
+        assert text_key("m", "Hello.") != text_key("m", "hello")
+        assert text_key("m", "hello", normalize=True) != text_key("other", "hello", normalize=True)
+
+
+class TestDiskEmbeddingCache:
+    """Test the persistent embedding cache."""
+    
+    @pytest.mark.asyncio
+    async def test_cached_embedder_survives_reopen(self, tmp_path):
+        """Test embeddings written to disk are reused by a new cache instance."""
+        provider = Mock(provider_name="fake", dimension=2, cache_id="fake:m:2")
+        provider.embed_texts = AsyncMock(
+            side_effect=lambda texts: np.array([[0.5, float(len(t))] for t in texts], dtype=np.float32)
+        )
+        path = tmp_path / "embeddings.sqlite3"
+        
+        cache = DiskEmbeddingCache(path)
+        assert (await CachedEmbedder(provider, cache).embed_texts(["a", "bb"])).tolist() == [[0.5, 1.0], [0.5, 2.0]]
+        cache.close()
+        
+        cache = DiskEmbeddingCache(path)
+        result = await CachedEmbedder(provider, cache).embed_texts(["bb", "ccc"])
+        assert result.tolist() == [[0.5, 2.0], [0.5, 3.0]]
+        assert provider.embed_texts.call_args.args[0] == ["ccc"]
+        assert len(cache) == 3
+    
+    def test_local_cache_id_uses_full_model_and_options(self):
+        """Test local models sharing a short name or differing in normalization get distinct cache ids."""
+        ids = {
+            LocalEmbeddingProvider(model_name="org-a/mini").cache_id,
+            LocalEmbeddingProvider(model_name="org-b/mini").cache_id,
+            LocalEmbeddingProvider(model_name="org-a/mini", normalize=False).cache_id,
+            LocalEmbeddingProvider(model_name="org-a/mini", backend="fastembed").cache_id,
+        }
+        assert len(ids) == 4
+
+
+class TestToolContext:
+    """Test binding tools to the shared context."""
+    
+    @pytest.mark.asyncio
+    async def test_bind_tool_hides_ctx(self):
+        """Test bound tools keep their name and docs but drop ctx from the signature."""
+        import inspect
+        
+        async def endee_example(ctx: ToolContext, name: str, k: int = 3) -> dict:
+            """Example tool."""
+            return {"client": ctx.endee_client, "name": name, "k": k}
+        
+        ctx = ToolContext(config=Config(), endee_client="client", embedding_manager=None)
+        tool = bind_tool(endee_example, ctx)
+        
+        assert tool.__name__ == "endee_example"
+        assert tool.__doc__ == "Example tool."
+        assert list(inspect.signature(tool).parameters) == ["name", "k"]
+        assert await tool("idx", k=5) == {"client": "client", "name": "idx", "k": 5}
+
+
+class TestVectorTools:
+    """Test vector operation tools."""
+    
+    @pytest.mark.asyncio
+    async def test_upsert_documents_chunks_embeddings_and_upserts(self):
+        """Test documents are embedded in chunks and upserted in order."""
+        provider = Mock(provider_name="local", active_model="mini", embed_texts=AsyncMock(
+            side_effect=lambda texts: np.array([[float(t)] for t in texts], dtype=np.float32)
+        ))
+        ctx = Mock(
+            config=Config(embed_batch_size=2),
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={"precision": "float32", "space_type": "cosine"}),
+                upsert_vectors_float32=AsyncMock(return_value={"success": True}),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        documents = [{"id": f"d{i}", "text": str(i)} for i in range(5)]
+        documents[1]["meta"] = {"title": "one"}
+        
+        with patch.object(vector_tools, "_UPSERT_BATCH_SIZE", 3):
+            result = await vector_tools.endee_upsert_documents(ctx, "idx", documents)
+        
+        assert result["success"] is True
+        assert result["embedding_model"] == "mini"
+        assert [c.args[0] for c in provider.embed_texts.call_args_list] == [["0", "1"], ["2"], ["3", "4"]]
+        first, second = ctx.endee_client.upsert_vectors_float32.call_args_list
+        assert first.args[1] == ["d0", "d1", "d2"] and second.args[1] == ["d3", "d4"]
+        assert first.args[2].tolist() == [[0.0], [1.0], [2.0]]
+        assert first.args[3] == [None, {"title": "one"}, None]
+    
+    @pytest.mark.asyncio
+    async def test_upsert_documents_embeds_during_index_lookup(self):
+        """Test the first batch starts embedding before the index info arrives."""
+        provider = Mock(provider_name="local", active_model="mini", embed_texts=AsyncMock(
+            return_value=np.ones((1, 2), dtype=np.float32)
+        ))
+        embedding_started = []
+        
+        async def get_index_info(name):
+            await asyncio.sleep(0)
+            embedding_started.append(provider.embed_texts.called)
+            return {"precision": "float32", "space_type": "cosine"}
+        
+        ctx = Mock(
+            config=Config(),
+            endee_client=Mock(
+                get_index_info=get_index_info,
+                upsert_vectors_float32=AsyncMock(return_value={"success": True}),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        
+        await vector_tools.endee_upsert_documents(ctx, "idx", [{"id": "d", "text": "t"}])
+        
+        assert embedding_started == [True]
+    
+    @pytest.mark.asyncio
+    async def test_upsert_documents_raises_embedding_errors(self):
+        """Test an embedding failure stops the pipeline after the batches already sent."""
+        async def embed_texts(texts):
+            if "3" in texts:
+                raise RuntimeError("embedding failed")
+            return np.zeros((len(texts), 1), dtype=np.float32)
+        
+        provider = Mock(provider_name="local", embed_texts=AsyncMock(side_effect=embed_texts))
+        ctx = Mock(
+            config=Config(),
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={"precision": "float32", "space_type": "cosine"}),
+                upsert_vectors_float32=AsyncMock(return_value={"success": True}),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        documents = [{"id": f"d{i}", "text": str(i)} for i in range(6)]
+        
+        with patch.object(vector_tools, "_UPSERT_BATCH_SIZE", 3):
+            with pytest.raises(RuntimeError, match="embedding failed"):
+                await vector_tools.endee_upsert_documents(ctx, "idx", documents)
+        
+        ctx.endee_client.upsert_vectors_float32.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_upsert_documents_sends_int8_to_int8d_cosine_index(self):
+        """Test int8d cosine indexes receive client-quantized vectors."""
+        provider = Mock(provider_name="local", active_model="mini", embed_texts=AsyncMock(
+            return_value=np.ones((2, 4), dtype=np.float32)
+        ))
+        ctx = Mock(
+            config=Config(),
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={"precision": "int8d", "space_type": "cosine"}),
+                upsert_vectors_int8=AsyncMock(return_value={"success": True}),
+                upsert_vectors_float32=AsyncMock(),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        documents = [{"id": "a", "text": "x"}, {"id": "b", "text": "y"}]
+        
+        result = await vector_tools.endee_upsert_documents(ctx, "idx", documents)
+        
+        assert result["success"] is True
+        assert ctx.endee_client.upsert_vectors_int8.call_args.args[1] == ["a", "b"]
+        ctx.endee_client.upsert_vectors_float32.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_upsert_documents_writes_bm25_sparse_vectors_to_hybrid_index(self):
+        """Test documents upserted into hybrid indexes carry the same BM25 encoding as queries."""
+        provider = Mock(provider_name="local", active_model="mini", embed_texts=AsyncMock(
+            side_effect=lambda texts: np.ones((len(texts), 2), dtype=np.float32)
+        ))
+        ctx = Mock(
+            config=Config(),
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={"sparse_dim": 64, "space_type": "cosine"}),
+                upsert_vectors=AsyncMock(return_value={"success": True}),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        
+        result = await vector_tools.endee_upsert_documents(
+            ctx, "idx", [{"id": "d", "text": "vector search", "meta": {"t": 1}}]
+        )
+        
+        assert result["success"] is True
+        (vector,) = ctx.endee_client.upsert_vectors.call_args.args[1]
+        assert vector["id"] == "d" and vector["meta"] == {"t": 1}
+        assert (vector["sparse_indices"], vector["sparse_values"]) == BM25Encoder(64).encode("vector search")
+    
+    @pytest.mark.asyncio
+    async def test_upsert_documents_embeds_duplicates_once(self):
+        """Test repeated texts in a batch are embedded once and every document gets a row."""
+        provider = Mock(provider_name="local", active_model="mini", embed_texts=AsyncMock(
+            side_effect=lambda texts: np.array([[float(t)] for t in texts], dtype=np.float32)
+        ))
+        ctx = Mock(
+            config=Config(),
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={}),
+                upsert_vectors_float32=AsyncMock(return_value={"success": True}),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        documents = [{"id": str(i), "text": t} for i, t in enumerate(["1", "2", "1", "1"])]
+        
+        await vector_tools.endee_upsert_documents(ctx, "idx", documents)
+        
+        provider.embed_texts.assert_awaited_once_with(["1", "2"])
+        vectors = ctx.endee_client.upsert_vectors_float32.call_args.args[2]
+        assert vectors.tolist() == [[1.0], [2.0], [1.0], [1.0]]
+
+
+class TestBatchImport:
+    """Test batch import helpers."""
+    
+    @pytest.mark.asyncio
+    async def test_embed_unique_dedupes_across_batches(self):
+        """Test each distinct text is embedded once, in length-sorted batches."""
+        provider = Mock()
+        provider.embed_texts = AsyncMock(side_effect=lambda texts: np.array([[float(len(t))] for t in texts], dtype=np.float32))
+        
+        text_to_vec = await _embed_unique(provider, ["ccc", "a", "ccc", "bb", "a"], batch_size=2)
+        
+        assert {text: vec.tolist() for text, vec in text_to_vec.items()} == {"a": [1.0], "bb": [2.0], "ccc": [3.0]}
+        assert [c.args[0] for c in provider.embed_texts.call_args_list] == [["a", "bb"], ["ccc"]]
+    
+    def test_json_records_are_streamed_in_batches(self, tmp_path):
+        """Test JSONL and JSON array files are read lazily into batches."""
+        jsonl = tmp_path / "data.jsonl"
+        jsonl.write_text('{"id": 1}\n\n{"id": 2}\n{"id": 3}\n')
+        array = tmp_path / "data.json"
+        array.write_text('[{"id": 1}, {"id": 2}, {"id": 3}]')
+        
+        for path in (jsonl, array):
+            batches = list(_batched(_iter_json_records(path), 2))
+            assert batches == [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+    
+    @pytest.mark.asyncio
+    async def test_import_embeds_next_batch_during_upsert(self):
+        """Test the next batch is embedded while the previous one is upserted."""
+        second_batch_embedded = asyncio.Event()
+        
+        async def embed_texts(texts):
+            if texts == ["c"]:
+                second_batch_embedded.set()
+            return np.ones((len(texts), 2), dtype=np.float32)
+        
+        async def upsert_vectors_float32(index_name, ids, vectors, meta, filters):
+            if ids[0] == 1:
+                await second_batch_embedded.wait()
+            return {"success": True}
+        
+        provider = Mock(embed_texts=AsyncMock(side_effect=embed_texts))
+        ctx = Mock(
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={}),
+                upsert_vectors_float32=AsyncMock(side_effect=upsert_vectors_float32),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        records = [{"id": 1, "text": "a"}, {"id": 2, "text": "b"}, {"id": 3, "text": "c"}]
+        
+        result = await asyncio.wait_for(
+            _import_records(ctx, "idx", records, "id", "text", None, None, None, batch_size=2),
+            timeout=1,
+        )
+        
+        assert result == {"success": True, "total_imported": 3, "failed": 0}
+    
+    @pytest.mark.asyncio
+    async def test_import_embedding_error_cancels_upserts(self):
+        """Test an embedding failure stops in-flight upserts before the error is raised."""
+        upsert_started = asyncio.Event()
+        upsert_cancelled = False
+        
+        async def embed_texts(texts):
+            if texts == ["c"]:
+                await upsert_started.wait()
+                raise RuntimeError("embedding failed")
+            return np.ones((len(texts), 2), dtype=np.float32)
+        
+        async def upsert_vectors_float32(index_name, ids, vectors, meta, filters):
+            nonlocal upsert_cancelled
+            upsert_started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                upsert_cancelled = True
+                raise
+            return {"success": True}
+        
+        provider = Mock(embed_texts=AsyncMock(side_effect=embed_texts))
+        ctx = Mock(
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={}),
+                upsert_vectors_float32=AsyncMock(side_effect=upsert_vectors_float32),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        records = [{"id": 1, "text": "a"}, {"id": 2, "text": "b"}, {"id": 3, "text": "c"}]
+        
+        with pytest.raises(RuntimeError, match="embedding failed"):
+            await asyncio.wait_for(
+                _import_records(ctx, "idx", records, "id", "text", None, None, None, batch_size=2),
+                timeout=1,
+            )
+        
+        assert upsert_cancelled
+    
+    @pytest.mark.asyncio
+    async def test_import_failure_leaves_no_tasks_behind(self):
+        """Test a failed import cancels and awaits its index lookup."""
+        lookup_started = asyncio.Event()
+        
+        async def get_index_info(name):
+            lookup_started.set()
+            await asyncio.Event().wait()
+        
+        async def embed_texts(texts):
+            await lookup_started.wait()
+            raise RuntimeError("embedding failed")
+        
+        provider = Mock(embed_texts=AsyncMock(side_effect=embed_texts))
+        ctx = Mock(
+            endee_client=Mock(get_index_info=get_index_info),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        records = [{"id": 1, "text": "a"}]
+        
+        with pytest.raises(RuntimeError, match="embedding failed"):
+            await _import_records(ctx, "idx", records, "id", "text", None, None, None, batch_size=2)
+        
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+    
+    @pytest.mark.asyncio
+    async def test_import_skips_invalid_records_before_embedding(self):
+        """Test records without an id or text are counted as failed and never embedded."""
+        provider = Mock(embed_texts=AsyncMock(
+            side_effect=lambda texts: np.array([[float(len(t))] for t in texts], dtype=np.float32)
+        ))
+        ctx = Mock(
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={}),
+                upsert_vectors_float32=AsyncMock(return_value={"success": True}),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        records = [{"id": 1, "text": "a"}, {"text": "orphan"}, {"id": 3}, {"id": 4, "text": "ccc"}]
+        
+        result = await _import_records(ctx, "idx", records, "id", "text", None, None, None, batch_size=10)
+        
+        assert result == {"success": True, "total_imported": 2, "failed": 2}
+        provider.embed_texts.assert_awaited_once_with(["a", "ccc"])
+        _, ids, vectors, meta, filters = ctx.endee_client.upsert_vectors_float32.call_args.args
+        assert ids == [1, 4]
+        assert [v.tolist() for v in vectors] == [[1.0], [3.0]]
+        assert meta is None and filters is None
+    
+    @pytest.mark.asyncio
+    async def test_import_writes_bm25_sparse_vectors_to_hybrid_index(self):
+        """Test text imports into hybrid indexes carry the same BM25 encoding as queries."""
+        provider = Mock(embed_texts=AsyncMock(side_effect=lambda texts: np.ones((len(texts), 2))))
+        ctx = Mock(
+            endee_client=Mock(
+                get_index_info=AsyncMock(return_value={"sparse_dim": 64}),
+                upsert_vectors=AsyncMock(return_value={"success": True}),
+            ),
+            embedding_manager=Mock(get_import_provider=Mock(return_value=provider)),
+        )
+        records = [{"id": 1, "text": "vector search", "kind": "a"}]
+        
+        result = await _import_records(ctx, "idx", records, "id", "text", None, None, ["kind"], batch_size=10)
+        
+        assert result == {"success": True, "total_imported": 1, "failed": 0}
+        (vector,) = ctx.endee_client.upsert_vectors.call_args.args[1]
+        assert vector["filter"] == {"kind": "a"} and vector["meta"] is None
+        assert (vector["sparse_indices"], vector["sparse_values"]) == BM25Encoder(64).encode("vector search")
+    
+    @pytest.mark.asyncio
+    async def test_import_bounds_concurrent_upserts(self):
+        """Test upserts overlap but never exceed the concurrency limit."""
+        in_flight = peak = 0
+        
+        async def upsert_vectors_float32(index_name, ids, vectors, meta, filters):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if ids[0] == 4:
+                raise EndeeError("boom")
+            return {"success": True}
+        
+        ctx = Mock(endee_client=Mock(
+            upsert_vectors_float32=AsyncMock(side_effect=upsert_vectors_float32)
+        ))
+        records = [{"id": i, "vec": [0.1]} for i in range(10)]
+        
+        result = await _import_records(
+            ctx, "idx", records, "id", None, "vec", None, None, batch_size=2, concurrency=3
+        )
+        
+        assert peak == 3
+        assert result == {"success": True, "total_imported": 8, "failed": 2}
+    
+    def test_parse_vector_formats(self):
+        """Test vector cells may be JSON arrays or bare separated floats."""
+        assert _parse_vector("[0.5, 1.0]") == [0.5, 1.0]
+        assert _parse_vector("0.5 1.0  2") == [0.5, 1.0, 2.0]
+        assert _parse_vector(" 0.5,1.0 ") == [0.5, 1.0]
+        with pytest.raises(orjson.JSONDecodeError):
+            _parse_vector("not-a-vector")
+    
+    @pytest.mark.asyncio
+    async def test_import_csv_parses_vector_column(self, tmp_path):
+        """Test JSON-encoded vector columns are decoded and upserted."""
+        path = tmp_path / "data.csv"
+        path.write_text('id,vec,kind\n1,"[0.5, 1.0]",a\n2,not-a-vector,b\n')
+        ctx = Mock(
+            config=Config(),
+            endee_client=Mock(upsert_vectors_float32=AsyncMock(return_value={"success": True})),
+        )
+        
+        result = await endee_import_csv(
+            ctx, "idx", str(path), vector_column="vec", filter_columns=["kind"]
+        )
+        
+        assert result == {"success": True, "total_imported": 1, "failed": 1}
+        ctx.endee_client.upsert_vectors_float32.assert_awaited_once_with(
+            "idx", ["1"], [[0.5, 1.0]], None, [{"kind": "a"}]
+        )
 
 
 class TestEmbeddingManager:
@@ -292,6 +1020,49 @@ class TestEmbeddingManager:
         provider = manager.get_provider()
         assert provider.provider_name.startswith("local")
     
+    @pytest.mark.asyncio
+    async def test_embed_query_cached(self):
+        """Test repeated queries are embedded only once."""
+        manager = EmbeddingManager(provider_type="none")
+        provider = manager.get_provider()
+        with patch.object(provider, 'embed_query', AsyncMock(return_value=[0.1, 0.2])) as mock_embed:
+            first = await manager.embed_query_cached("hello")
+            second = await manager.embed_query_cached("hello")
+        assert first == second == [0.1, 0.2]
+        assert mock_embed.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_one_embed_call(self):
+        """Test a burst of distinct queries is embedded in a single batch."""
+        manager = EmbeddingManager(provider_type="none")
+        provider = manager.get_provider()
+        embed_texts = AsyncMock(side_effect=lambda texts: np.array([[float(len(t))] for t in texts]))
+        with patch.object(provider, 'embed_texts', embed_texts):
+            results = await asyncio.gather(
+                *(manager.embed_query_cached(text) for text in ["a", "bb", "a", "ccc"])
+            )
+        assert [r.tolist() for r in results] == [[1.0], [2.0], [1.0], [3.0]]
+        embed_texts.assert_awaited_once_with(["a", "bb", "ccc"])
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_cancels_waiting_queries(self):
+        """Test callers waiting on a batch that gets cancelled do not hang."""
+        embedding_started = asyncio.Event()
+        
+        async def embed_query(text):
+            embedding_started.set()
+            await asyncio.Event().wait()
+        
+        batcher = QueryBatcher(Mock(embed_query=embed_query))
+        waiting = asyncio.gather(batcher.embed("a"), batcher.embed("a"), return_exceptions=True)
+        await embedding_started.wait()
+        (batch_task,) = batcher._in_flight
+        batch_task.cancel()
+        
+        results = await asyncio.wait_for(waiting, timeout=1)
+        
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    
     def test_openai_without_key_raises(self):
         """Test that OpenAI provider requires key."""
         manager = EmbeddingManager(provider_type="openai", openai_api_key=None)
@@ -328,15 +1099,28 @@ class TestEndeeClient:
         """Test client initialization with auth."""
         assert auth_client.auth_token == "test-token"
     
-    def test_get_headers_no_auth(self, client):
+    def test_init_http2_requires_h2(self):
+        """Test HTTP/2 reports a missing h2 package."""
+        with patch.dict(sys.modules, {"h2": None}):
+            with pytest.raises(ImportError, match="httpx\\[http2\\]"):
+                EndeeClient(base_url="http://localhost:8080", http2=True)
+    
+    @pytest.mark.asyncio
+    async def test_async_context_manager(self):
+        """Test the client closes its connections on exit."""
+        async with EndeeClient(base_url="http://localhost:8080") as client:
+            assert not client.client.is_closed
+        assert client.client.is_closed
+    
+    def test_headers_no_auth(self, client):
         """Test headers without auth."""
-        headers = client._get_headers()
+        headers = client._headers
         assert headers["Content-Type"] == "application/json"
         assert "Authorization" not in headers
     
-    def test_get_headers_with_auth(self, auth_client):
+    def test_headers_with_auth(self, auth_client):
         """Test headers with auth."""
-        headers = auth_client._get_headers()
+        headers = auth_client._headers
         assert headers["Content-Type"] == "application/json"
         assert headers["Authorization"] == "test-token"
     
@@ -350,6 +1134,319 @@ class TestEndeeClient:
         with patch.object(client.client, 'get', return_value=mock_response):
             result = await client.health_check()
             assert result["status"] == "ok"
+    
+    @pytest.mark.asyncio
+    async def test_upsert_vectors_sends_msgpack(self, client):
+        """Test hybrid upserts are packed in the server's positional layout."""
+        client._space_types["test"] = "l2"
+        mock_response = Mock(status_code=200)
+        mock_response.raise_for_status = Mock()
+        vectors = [{
+            "id": "doc1",
+            "vector": [0.5, 0.25],
+            "meta": {"title": "Doc"},
+            "filter": {"category": "test"},
+            "sparse_indices": [3],
+            "sparse_values": [1.0],
+        }]
+        
+        with patch.object(client.client, 'post', return_value=mock_response) as mock_post:
+            result = await client.upsert_vectors("test", vectors)
+        
+        assert result == {"success": True}
+        kwargs = mock_post.call_args.kwargs
+        assert kwargs["headers"]["Content-Type"] == "application/msgpack"
+        packed = msgpack.unpackb(kwargs["content"], raw=False)
+        vid, meta, filter_json, norm, vector, sparse_ids, sparse_values = packed[0]
+        assert vid == "doc1"
+        assert orjson.loads(zlib.decompress(meta)) == {"title": "Doc"}
+        assert orjson.loads(filter_json) == {"category": "test"}
+        assert vector == [0.5, 0.25]
+        assert sparse_ids == [3] and sparse_values == [1.0]
+    
+    @pytest.mark.asyncio
+    async def test_upsert_vectors_packs_dense_batch_as_float32_bytes(self, client):
+        """Test dense batches are sent as one float32 matrix."""
+        client._space_types["test"] = "l2"
+        mock_response = Mock(status_code=200)
+        mock_response.raise_for_status = Mock()
+        vectors = [
+            {"id": 1, "vector": np.array([0.5, 0.25], dtype=np.float32), "filter": {"k": "a"}},
+            {"id": 2, "vector": [1.0, 2.0]},
+        ]
+        
+        with patch.object(client.client, 'post', return_value=mock_response) as mock_post:
+            await client.upsert_vectors("test", vectors)
+        
+        packed = msgpack.unpackb(mock_post.call_args.kwargs["content"], raw=False)
+        assert packed["ids"] == ["1", "2"]
+        assert packed["dim"] == 2
+        assert np.frombuffer(packed["v"], dtype="<f4").tolist() == [0.5, 0.25, 1.0, 2.0]
+        assert [orjson.loads(f) if f else None for f in packed["filter"]] == [{"k": "a"}, None]
+        assert "meta" not in packed
+    
+    @pytest.mark.asyncio
+    async def test_upsert_vectors_compressed(self):
+        """Test large request bodies are deflated when compression is enabled."""
+        client = EndeeClient(base_url="http://localhost:8080", compress_requests=True)
+        client._space_types["test"] = "l2"
+        response = Mock()
+        response.status_code = 200
+        response.raise_for_status = Mock()
+        vectors = [{"id": str(i), "vector": [0.5] * 64} for i in range(32)]
+        
+        with patch.object(client.client, 'post', return_value=response) as mock_post:
+            await client.upsert_vectors("test", vectors)
+            await client.upsert_vectors("test", vectors[:1])
+        
+        large, small = mock_post.call_args_list
+        assert large.kwargs["headers"]["Content-Encoding"] == "deflate"
+        assert len(msgpack.unpackb(zlib.decompress(large.kwargs["content"]))["ids"]) == 32
+        assert "Content-Encoding" not in small.kwargs["headers"]
+    
+    @pytest.mark.asyncio
+    async def test_upsert_vectors_float32_columns(self, client):
+        """Test column-wise upsert packs one matrix and rejects ragged rows."""
+        client._space_types["test"] = "l2"
+        mock_response = Mock(status_code=200)
+        mock_response.raise_for_status = Mock()
+        
+        with patch.object(client.client, 'post', return_value=mock_response) as mock_post:
+            await client.upsert_vectors_float32(
+                "test", [1, 2], [[0.5, 0.25], [1.0, 2.0]], meta=[None, None], filters=[{"k": "a"}, None]
+            )
+            with pytest.raises(ValueError):
+                await client.upsert_vectors_float32("test", [1, 2], [[0.5, 0.25], [1.0]])
+        
+        mock_post.assert_called_once()
+        packed = msgpack.unpackb(mock_post.call_args.kwargs["content"], raw=False)
+        assert packed["ids"] == ["1", "2"]
+        assert np.frombuffer(packed["v"], dtype="<f4").tolist() == [0.5, 0.25, 1.0, 2.0]
+        assert "filter" in packed and "meta" not in packed
+        assert "norms" not in packed
+    
+    @pytest.mark.asyncio
+    async def test_upsert_vectors_normalizes_for_cosine_index(self, client):
+        """Test both float32 wire paths send unit vectors and norms to cosine indexes."""
+        info_response = Mock()
+        info_response.json.return_value = {"name": "test", "space_type": "cosine"}
+        info_response.raise_for_status = Mock()
+        mock_response = Mock(status_code=200)
+        mock_response.raise_for_status = Mock()
+        
+        with patch.object(client.client, 'get', return_value=info_response) as mock_get, \
+             patch.object(client.client, 'post', return_value=mock_response) as mock_post:
+            await client.upsert_vectors_float32("test", ["a"], [[3.0, 4.0]])
+            await client.upsert_vectors("test", [
+                {"id": "b", "vector": [3.0, 4.0], "sparse_indices": [1], "sparse_values": [1.0]}
+            ])
+        
+        # The space type outlives the info cache the upserts invalidate
+        mock_get.assert_called_once()
+        columns, rows = (msgpack.unpackb(c.kwargs["content"], raw=False) for c in mock_post.call_args_list)
+        assert np.allclose(np.frombuffer(columns["v"], dtype="<f4"), [0.6, 0.8])
+        assert np.allclose(columns["norms"], [5.0])
+        _, _, _, norm, vector, _, _ = rows[0]
+        assert norm == pytest.approx(5.0)
+        assert np.allclose(vector, [0.6, 0.8])
+    
+    @pytest.mark.asyncio
+    async def test_upsert_vectors_int8(self, client):
+        """Test int8 upsert sends one byte per element."""
+        client._space_types["test"] = "cosine"
+        mock_response = Mock(status_code=200)
+        mock_response.raise_for_status = Mock()
+        vectors = np.array([[3.0, 4.0], [1.0, 0.0]], dtype=np.float32)
+        
+        with patch.object(client.client, 'post', return_value=mock_response) as mock_post:
+            await client.upsert_vectors_int8("test", ["a", "b"], vectors)
+        
+        payload = msgpack.unpackb(mock_post.call_args.kwargs["content"], raw=False)
+        assert payload["ids"] == ["a", "b"]
+        assert payload["dim"] == 2
+        assert len(payload["q"]) == 4
+        assert np.allclose(payload["norms"], [5.0, 1.0])
+        assert "meta" not in payload
+    
+    @pytest.mark.asyncio
+    async def test_upsert_vectors_int8_keeps_magnitude_for_l2_index(self, client):
+        """Test non-cosine int8 upserts dequantize back to the original rows."""
+        client._space_types["test"] = "l2"
+        mock_response = Mock(status_code=200)
+        mock_response.raise_for_status = Mock()
+        vectors = np.array([[30.0, -40.0], [2.0, 0.5]], dtype=np.float32)
+        
+        with patch.object(client.client, 'post', return_value=mock_response) as mock_post:
+            await client.upsert_vectors_int8("test", ["a", "b"], vectors)
+        
+        payload = msgpack.unpackb(mock_post.call_args.kwargs["content"], raw=False)
+        codes = np.frombuffer(payload["q"], dtype=np.int8).reshape(2, 2)
+        restored = codes * np.asarray(payload["scales"], dtype=np.float32)[:, None]
+        assert np.allclose(restored, vectors, rtol=0.01)
+        assert "norms" not in payload
+    
+    @pytest.mark.asyncio
+    async def test_batch_search_splits_large_batches(self, client):
+        """Test batch search chunks queries and keeps result order."""
+        def make_response(ids):
+            response = Mock()
+            response.raise_for_status = Mock()
+            response.content = msgpack.packb([
+                [[0.9, i, b"", "", 1.0, []]] for i in ids
+            ])
+            return response
+        
+        queries = [{"vector": [0.1, 0.2], "k": 1} for _ in range(3)]
+        responses = [make_response(["q0", "q1"]), make_response(["q2"])]
+        
+        with patch.object(client.client, 'post', side_effect=responses) as mock_post:
+            results = await client.batch_search("test", queries, max_batch=2)
+        
+        assert mock_post.call_count == 2
+        assert mock_post.call_args_list[0].args[0].endswith("/api/v1/index/test/search/batch")
+        assert len(orjson.loads(mock_post.call_args_list[0].kwargs["content"])["queries"]) == 2
+        assert [r[0].id for r in results] == ["q0", "q1", "q2"]
+    
+    def test_parse_search_response(self, client):
+        """Test positional server results are decoded into SearchResults."""
+        data = msgpack.packb([
+            [0.75, "doc-1", zlib.compress(b'{"title": "a"}'), '{"tag": "x"}', 1.0, [0.5, 0.5]],
+            [0.5, "doc-2", b"", "", 1.0, []],
+        ], use_bin_type=True)
+        
+        first, second = client._parse_search_response(data)
+        
+        assert first.id == "doc-1"
+        assert first.distance == pytest.approx(0.25)
+        assert first.meta == {"title": "a"}
+        assert first.filter == {"tag": "x"}
+        assert first.vector == [0.5, 0.5]
+        assert second.meta is None and second.filter is None and second.vector is None
+    
+    @pytest.mark.asyncio
+    async def test_get_vector_decodes_msgpack(self, client):
+        """Test get_vector returns the decoded vector object."""
+        response = Mock()
+        response.status_code = 200
+        response.raise_for_status = Mock()
+        response.content = msgpack.packb(
+            ["doc-1", zlib.compress(b'{"title": "a"}'), '{"tag": "x"}', 1.0, [0.5, 0.5]],
+            use_bin_type=True,
+        )
+        
+        with patch.object(client.client, 'post', return_value=response):
+            result = await client.get_vector("test", "doc-1")
+        
+        assert result == {
+            "id": "doc-1",
+            "meta": {"title": "a"},
+            "filter": {"tag": "x"},
+            "norm": 1.0,
+            "vector": [0.5, 0.5],
+        }
+    
+    @pytest.mark.asyncio
+    async def test_search_sends_vector_as_float32_base64(self, client):
+        """Test query vectors are sent as base64-encoded float32 bytes."""
+        response = Mock()
+        response.raise_for_status = Mock()
+        response.content = msgpack.packb([])
+        
+        with patch.object(client.client, 'post', return_value=response) as mock_post:
+            await client.search("test", vector=np.array([0.5, 0.25], dtype=np.float64))
+        
+        payload = orjson.loads(mock_post.call_args.kwargs["content"])
+        assert "vector" not in payload
+        assert np.frombuffer(base64.b64decode(payload["vector_b64"]), dtype="<f4").tolist() == [0.5, 0.25]
+    
+    @pytest.mark.asyncio
+    async def test_search_sends_filter_as_array(self, client):
+        """Test filter conditions are embedded as JSON, not a JSON string."""
+        response = Mock()
+        response.raise_for_status = Mock()
+        response.content = msgpack.packb([])
+        conditions = [{"category": {"$eq": "tech"}}]
+        
+        with patch.object(client.client, 'post', return_value=response) as mock_post:
+            await client.search("test", vector=[0.1, 0.2], filter_conditions=conditions)
+            await client.search("test", vector=[0.1, 0.2])
+        
+        filtered, unfiltered = [
+            orjson.loads(call.kwargs["content"]) for call in mock_post.call_args_list
+        ]
+        assert filtered["filter"] == conditions
+        assert "filter" not in unfiltered
+    
+    @pytest.mark.asyncio
+    async def test_list_indexes_ttl_cache(self, client):
+        """Test index listings are reused until the TTL or a create."""
+        response = Mock()
+        response.raise_for_status = Mock()
+        response.json = Mock(return_value={"indexes": [{"name": "a", "dimension": 2}]})
+        
+        with patch.object(client.client, 'get', return_value=response) as mock_get:
+            first = await client.list_indexes()
+            second = await client.list_indexes()
+            assert mock_get.call_count == 1
+            assert second is first
+            
+            with patch.object(client.client, 'post', return_value=response):
+                await client.create_index(IndexConfig(name="b", dimension=2))
+            await client.list_indexes()
+            assert mock_get.call_count == 2
+            
+            client.cache_ttl = 0
+            await client.list_indexes()
+            assert mock_get.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_search_stream_window(self, client):
+        """Test search_stream bounds in-flight searches and yields every query."""
+        in_flight = 0
+        peak = 0
+        
+        async def fake_search(index_name, vector=None, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001 * vector[0])
+            in_flight -= 1
+            return [SearchResult.from_packed(str(vector[0]), 0.9)]
+        
+        queries = [{"vector": [float(i % 3), 1.0]} for i in range(7)]
+        with patch.object(client, 'search', side_effect=fake_search):
+            results = {pos: r async for pos, r in client.search_stream("test", queries, window=3)}
+        
+        assert peak == 3
+        assert sorted(results) == list(range(7))
+        assert results[4][0].id == "1.0"
+    
+    @pytest.mark.asyncio
+    async def test_search_semantic_cache(self):
+        """Test near-duplicate queries are served from the semantic cache."""
+        client = EndeeClient(
+            base_url="http://localhost:8080",
+            semantic_cache=SemanticQueryCache(dim=2, capacity=4),
+        )
+        response = Mock()
+        response.raise_for_status = Mock()
+        response.content = msgpack.packb([[0.9, "a", b"", "", 1.0, []]])
+        
+        with patch.object(client.client, 'post', return_value=response) as mock_post:
+            first = await client.search("test", vector=[1.0, 0.0])
+            second = await client.search("test", vector=[0.999, 0.01])
+            await client.search("test", vector=[0.0, 1.0])
+        
+        assert mock_post.call_count == 2
+        # Served from the cache as a copy, so mutating it leaves the cache intact
+        assert second == first and second is not first
+        second.clear()
+        assert await client.search("test", vector=[1.0, 0.0]) == first
+        
+        client.semantic_cache.invalidate("test")
+        with patch.object(client.client, 'post', return_value=response) as mock_post:
+            await client.search("test", vector=[1.0, 0.0])
+        assert mock_post.call_count == 1
 
 
 # ============================================================================